@@ -1,7 +1,9 @@
 # coding: utf-8
 
+from types import MappingProxyType
+
 # Dictionary mapping Greek ordinal numerals (nominative, neuter) to integers
-GREEK_NUMERALS_ORDINAL = {
+_BASE_NUMERALS_ORDINAL = {
     'πρώτο': 1, 'δεύτερο': 2, 'τρίτο': 3, 'τέταρτο': 4, 'πέμπτο': 5,
     'έκτο': 6, 'έβδομο': 7, 'όγδοο': 8, 'ένατο': 9, 'δέκατο': 10,
     'ενδέκατο': 11, 'δωδέκατο': 12, 'δέκατο τρίτο': 13, 'δέκατο τέταρτο': 14,
@@ -46,27 +48,27 @@ GREEK_NUMERALS_ORDINAL = {
     'εκατοστό ενενηκοστό ένατο': 199, 'διακοσιοστό': 200
 }
 
-# Add compound hundreds automatically (e.g., εκατοστό εικοστό πρώτο etc.)
-hundreds_map = {
-    100: 'εκατοστό'
-    # Add 'διακοσιοστό', 'τριακοσιοστό' etc. if needed beyond 200
-}
-
-items_below_100 = {k:v for k,v in GREEK_NUMERALS_ORDINAL.items() if v < 100 and v > 0}
+def _build_greek_numerals():
+    """Returns the full ordinal mapping, built as a plain dict before freezing."""
+    numerals = dict(_BASE_NUMERALS_ORDINAL)
 
-for h_val, h_word in hundreds_map.items():
-    for u_word, u_val in items_below_100.items():
-        compound_word = f"{h_word} {u_word}"
-        compound_val = h_val + u_val
-        if compound_val <= 200: # Ensure we don't exceed the target
-             GREEK_NUMERALS_ORDINAL[compound_word] = compound_val
+    # Add compound hundreds automatically (e.g., εκατοστό εικοστό πρώτο etc.).
+    # Only 'εκατοστό' is needed: every ordinal below 100 keeps the result within 101-199.
+    # Add 'διακοσιοστό', 'τριακοσιοστό' etc. here if needed beyond 200.
+    numerals.update({
+        f"εκατοστό {word}": 100 + val
+        for word, val in _BASE_NUMERALS_ORDINAL.items() if 0 < val < 100
+    })
 
-# Add simple hundreds > 100
-more_hundreds = {
-    'τριακοσιοστό': 300, 'τετρακοσιοστό': 400, 'πεντακοσιοστό': 500,
-    'εξακοσιοστό': 600, 'επτακοσιοστό': 700, 'οκτακοσιοστό': 800,
-    'εννιακοσιοστό': 900, 'χιλιοστό': 1000
-    # Extend further if necessary
-}
-GREEK_NUMERALS_ORDINAL.update(more_hundreds)
+    # Add simple hundreds > 100
+    more_hundreds = {
+        'τριακοσιοστό': 300, 'τετρακοσιοστό': 400, 'πεντακοσιοστό': 500,
+        'εξακοσιοστό': 600, 'επτακοσιοστό': 700, 'οκτακοσιοστό': 800,
+        'εννιακοσιοστό': 900, 'χιλιοστό': 1000
+        # Extend further if necessary
+    }
+    numerals.update(more_hundreds)
+    return numerals
 
+# Read-only view: importers share this mapping (and cache lookups against it), so it must not be mutated.
+GREEK_NUMERALS_ORDINAL = MappingProxyType(_build_greek_numerals())
@@ -7,6 +7,9 @@ import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
 import logging
 import sys
 
@@ -37,10 +40,17 @@ AT_LEAST = 2   # Minimum number of articles to form a valid sequence
 INDEX_MAX_LINES_PERCENT = 0.20 # Check first 20% lines for index
 INDEX_MIN_EMPTY_LINES_PERCENT = 0.30 # >30% empty lines between index headers (DEPRECATED by avg line count)
 INDEX_MAX_AVG_NON_EMPTY_LINES = 2.5 # New criteria for index detection
+MAX_WORKERS = None # Worker processes for per-file processing (None = one per CPU)
+FILES_PER_WORKER_TASK = 8 # Files handed to a worker at a time, to amortise inter-process overhead
 
 # Regex to capture article headers and the text following 'Άρθρο '
 # This matches both markdown (## Άρθρο) and plain text (Άρθρο) formats, as well as table formats
 ARTICLE_PATTERN = re.compile(r"^(##\s*|\|\s*)?Άρθρο\s+(.*?)\s*($|\||\s*[-–—]|\.)", re.IGNORECASE)
+# Characters an ARTICLE_PATTERN match can start with ('##', '|', or Άρθρο in either case);
+# checking the first character is far cheaper than invoking the regex on every line.
+ARTICLE_LINE_START_CHARS = frozenset('#|Άά')
+# Shortest line ARTICLE_PATTERN can match: 'Άρθρο' plus the whitespace after it.
+ARTICLE_LINE_MIN_LENGTH = 6
 
 # --- Helper Functions ---
 
@@ -73,6 +83,41 @@ def count_non_empty_lines(lines):
     """Counts non-empty lines."""
     return sum(1 for line in lines if line.strip())
 
+# Arabic numeral at the start of the header text, followed by a delimiter
+LEADING_DIGITS_PATTERN = re.compile(r"^(\d+)(?:\s|$|\.|\,|\-|\'|\|)")
+
+# GREEK_NUMERALS_ORDINAL keys sorted by length descending to match longer phrases first
+SORTED_GREEK_NUMERALS = sorted(GREEK_NUMERALS_ORDINAL.keys(), key=len, reverse=True)
+
+@lru_cache(maxsize=4096)
+def parse_header_number(content_after_arthro):
+    """Parses the number at the start of the text following 'Άρθρο'.
+
+    Returns a (number, type) tuple, type being 'arabic' or 'greek_word', or
+    (None, None) if no number could be parsed. Results are cached since the same
+    header texts repeat across the index and body of a gazette and across files,
+    and the Greek word fallback scans every known numeral.
+    """
+    # 1. Check for Arabic numerals at the beginning
+    # This regex is more robust to handle numbers that might be followed by
+    # various punctuation or whitespace
+    digit_match = LEADING_DIGITS_PATTERN.match(content_after_arthro)
+    if digit_match:
+        return int(digit_match.group(1)), 'arabic'
+
+    # 2. Check for Greek word numerals at the beginning
+    content_lower = content_after_arthro.lower()
+    for greek_word in SORTED_GREEK_NUMERALS:
+        # Check if it starts with the greek word exactly or followed by delimiter
+        if content_lower.startswith(greek_word):
+            # Ensure it's a whole word match (followed by whitespace or end of string or punctuation)
+            next_char_pos = len(greek_word)
+            if next_char_pos >= len(content_lower) or \
+               content_lower[next_char_pos].isspace() or \
+               content_lower[next_char_pos] in '.,;:|()-':
+               return GREEK_NUMERALS_ORDINAL[greek_word], 'greek_word' # Found the longest match
+    return None, None
+
 # --- Core Logic Functions ---
 
 def find_potential_articles(filepath):
@@ -95,47 +140,22 @@ def find_potential_articles(filepath):
         logging.error(f"Error reading {filepath}: {e}")
         return [], []
 
-    # Sort GREEK_NUMERALS_ORDINAL keys by length descending to match longer phrases first
-    sorted_greek_numerals = sorted(GREEK_NUMERALS_ORDINAL.keys(), key=len, reverse=True)
-
     for i, line in enumerate(lines):
+        if len(line) < ARTICLE_LINE_MIN_LENGTH or line[0] not in ARTICLE_LINE_START_CHARS:
+            continue
         match = ARTICLE_PATTERN.match(line)
         if match:
-            full_line_text = line.strip() # Store the full original line
             content_after_arthro = match.group(2).strip()
-            num_val = None
-            num_type = None
-            parsed_num_str = None # The part identified as the number
-
-            # 1. Check for Arabic numerals at the beginning
-            # This regex is more robust to handle numbers that might be followed by
-            # various punctuation or whitespace
-            digit_match = re.match(r"^(\d+)(?:\s|$|\.|\,|\-|\'|\|)", content_after_arthro)
-            if digit_match:
-                parsed_num_str = digit_match.group(1)
-                num_val = int(parsed_num_str)
-                num_type = 'arabic'
-            else:
-                # 2. Check for Greek word numerals at the beginning
-                content_lower = content_after_arthro.lower()
-                for greek_word in sorted_greek_numerals:
-                    # Check if it starts with the greek word exactly or followed by delimiter
-                    if content_lower.startswith(greek_word):
-                        # Ensure it's a whole word match (followed by whitespace or end of string or punctuation)
-                        next_char_pos = len(greek_word)
-                        if next_char_pos >= len(content_lower) or \
-                           content_lower[next_char_pos].isspace() or \
-                           content_lower[next_char_pos] in '.,;:|()-':
-                           parsed_num_str = content_after_arthro[:len(greek_word)] # Get the original case substring
-                           num_val = GREEK_NUMERALS_ORDINAL[greek_word]
-                           num_type = 'greek_word'
-                           break # Found the longest match
+            num_val, num_type = parse_header_number(content_after_arthro)
 
             # If a number was successfully parsed from the beginning
             if num_val is not None:
                 articles.append({
                     'line_num': i,
-                    'text': full_line_text, # Use the full line as the title text
+                    # Use the full original line as the title text; interned so a header line that
+                    # repeats within a file (index and body) is one string. Results are pickled back
+                    # from worker processes, which keeps this per-file sharing but not any across files.
+                    'text': sys.intern(line.strip()),
                     'number': num_val,
                     'type': num_type,  # This is the ONLY thing that should affect sequence splitting
                     'used_in_sequence': False,
@@ -143,7 +163,7 @@ def find_potential_articles(filepath):
                 })
             else:
                  # Log warning only if parsing failed, not if it wasn't an article line
-                 logging.warning(f"Could not parse number at start of: '{content_after_arthro}' in {os.path.basename(filepath)} line {i+1}")
+                 logging.warning("Could not parse number at start of: '%s' in %s line %d", content_after_arthro, os.path.basename(filepath), i+1)
 
     return articles, lines
 
@@ -153,7 +173,7 @@ def detect_index(potential_articles, lines, filename):
     """
     file_length = len(lines)
     max_line_for_index = int(file_length * INDEX_MAX_LINES_PERCENT)
-    logging.info(f"File {filename}: {file_length} lines, max index line: {max_line_for_index}")
+    logging.info("File %s: %d lines, max index line: %d", filename, file_length, max_line_for_index)
     
     # First, identify all valid sequences in the document
     all_sequences = []
@@ -167,8 +187,8 @@ def detect_index(potential_articles, lines, filename):
         if len(articles) < AT_LEAST:
             continue
             
-        # Sort by line number
-        sorted_articles = sorted(articles, key=lambda x: x['line_num'])
+        # Already in line order: find_potential_articles appends them as it scans the file
+        sorted_articles = articles
         
         # Find all valid sequences with proper numbering
         current_sequence = [sorted_articles[0]]
@@ -208,7 +228,7 @@ def detect_index(potential_articles, lines, filename):
     
     # Filter for sequences that end before the 20% mark
     early_sequences = [seq for seq in all_sequences if seq['end_line'] <= max_line_for_index]
-    logging.info(f"Found {len(early_sequences)} sequences ending before line {max_line_for_index}")
+    logging.info("Found %d sequences ending before line %d", len(early_sequences), max_line_for_index)
     
     # Check each sequence to see if it qualifies as an index
     index_sequences = []
@@ -233,8 +253,8 @@ def detect_index(potential_articles, lines, filename):
         if avg_non_empty < INDEX_MAX_AVG_NON_EMPTY_LINES:
             seq['avg_non_empty'] = avg_non_empty
             index_sequences.append(seq)
-            logging.info(f"Index sequence: {seq['type']} from line {seq['start_line']+1} to {seq['end_line']+1}")
-            logging.info(f"  Articles {seq['start_num']}-{seq['end_num']}, avg non-empty: {avg_non_empty:.2f}")
+            logging.info("Index sequence: %s from line %d to %d", seq['type'], seq['start_line']+1, seq['end_line']+1)
+            logging.info("  Articles %s-%s, avg non-empty: %.2f", seq['start_num'], seq['end_num'], avg_non_empty)
     
     # Mark all articles in index sequences
     index_lines = set()
@@ -247,7 +267,7 @@ def detect_index(potential_articles, lines, filename):
     if index_lines:
         min_line = min(index_lines) + 1 if index_lines else 0
         max_line = max(index_lines) + 1 if index_lines else 0
-        logging.info(f"Total index: {len(index_lines)} articles from lines {min_line}-{max_line}")
+        logging.info("Total index: %d articles from lines %d-%d", len(index_lines), min_line, max_line)
     else:
         logging.info("No index sequences detected")
             
@@ -268,8 +288,8 @@ def find_sequences(potential_articles, filename):
     if not article_candidates:
         return {}
         
-    # Sort by line number to process in document order
-    sorted_articles = sorted(article_candidates, key=lambda x: x['line_num'])
+    # potential_articles is built in line order, so filtering keeps document order
+    sorted_articles = article_candidates
     
     sequences = []
     current_sequence = []
@@ -321,9 +341,9 @@ def find_sequences(potential_articles, filename):
     
     # Log sequence information
     if sequences:
-        logging.info(f"Found {len(sequences)} valid article sequences in {filename}")
+        logging.info("Found %d valid article sequences in %s", len(sequences), filename)
         for i, seq in enumerate(sequences):
-            logging.info(f"Sequence {i+1}: {len(seq)} articles, numbers {seq[0]['number']}-{seq[-1]['number']}, type: {seq[0]['type']}")
+            logging.info("Sequence %d: %d articles, numbers %s-%s, type: %s", i+1, len(seq), seq[0]['number'], seq[-1]['number'], seq[0]['type'])
     
     # Convert to dictionary keyed by line_num for easy access
     articles_in_sequences = {}
@@ -333,19 +353,24 @@ def find_sequences(potential_articles, filename):
     
     return articles_in_sequences
 
-def segment_content(filepath, lines, articles_in_sequences, index_lines):
-    """Segments the file content into Introduction and valid articles."""
+def segment_content(filepath, lines, articles_in_sequences, index_lines, potential_articles):
+    """Segments the file content into Introduction and valid articles.
+
+    potential_articles is the list already produced by find_potential_articles for
+    this file, so the file is not read and scanned a second time for the index.
+    """
     segments = []
     filename = os.path.basename(filepath)
+    # Segments are cut from the full text by line offsets: one string slice per
+    # segment instead of a list slice that is joined back together.
+    text = ''.join(lines)
+    line_offsets = list(accumulate(map(len, lines), initial=0))
     
     # Check if we have detected index lines for this file
     if index_lines:
-        # Get all potential articles from the file to find index articles
-        potential_articles, _ = find_potential_articles(filepath)
-        
         # Find the articles marked as index
-        index_articles = sorted([a for a in potential_articles if a['line_num'] in index_lines], 
-                              key=lambda x: x['line_num'])
+        # potential_articles is in line order, so the filtered index articles are too
+        index_articles = [a for a in potential_articles if a['line_num'] in index_lines]
         
         if index_articles:
             # Extract index content (from first to last index article, inclusive)
@@ -353,7 +378,7 @@ def segment_content(filepath, lines, articles_in_sequences, index_lines):
             last_idx = index_articles[-1]['line_num']
             
             # Extract the entire index section including the headers
-            index_content = ''.join(lines[first_idx:last_idx+1])
+            index_content = text[line_offsets[first_idx]:line_offsets[last_idx+1]]
             
             # If there's a title/header before the first index article,
             # try to capture it (like "## ΠΙΝΑΚΑΣ ΠΕΡΙΕΧΟΜΕΝΩΝ")
@@ -390,7 +415,7 @@ def segment_content(filepath, lines, articles_in_sequences, index_lines):
         
         # Only create intro if there's actual content between intro_start and first article
         if sorted_line_nums[0] > intro_start:
-            intro_content = ''.join(lines[intro_start:sorted_line_nums[0]])
+            intro_content = text[line_offsets[intro_start]:line_offsets[sorted_line_nums[0]]]
             if intro_content.strip():  # If there's actual content
                 segments.append({
                     'filename': filename,
@@ -410,7 +435,7 @@ def segment_content(filepath, lines, articles_in_sequences, index_lines):
         # Determine content: from current article to the next, or to the end of file
         content_start = line_num + 1  # Skip the article header line
         content_end = sorted_line_nums[i+1] if i < len(sorted_line_nums) - 1 else len(lines)
-        content = ''.join(lines[content_start:content_end])
+        content = text[line_offsets[content_start]:line_offsets[content_end]]
         
         segments.append({
             'filename': filename,
@@ -422,6 +447,40 @@ def segment_content(filepath, lines, articles_in_sequences, index_lines):
     
     return segments
 
+def process_gazette_file(filepath):
+    """Runs the full detection and segmentation for a single gazette file.
+
+    Returns (segments, unused_articles, potential_count, index_count, used_count),
+    or None if the file could not be read or is empty.
+    """
+    filename = os.path.basename(filepath)
+    logging.info("Processing %s...", filename)
+
+    potential_articles, lines = find_potential_articles(filepath)
+    if not lines:
+        return None
+
+    for article_candidate in potential_articles: article_candidate['filename'] = filename
+
+    index_lines = detect_index(potential_articles, lines, filename)
+
+    non_index_articles = [a for a in potential_articles if not a['is_index']]
+
+    articles_in_sequences = find_sequences(non_index_articles, filename)
+
+    file_segments = segment_content(filepath, lines, articles_in_sequences, index_lines, potential_articles)
+
+    unused_articles = []
+    for article in potential_articles:
+        if not article['is_index'] and not article['used_in_sequence']:
+            unused_articles.append({
+                'filename': filename,
+                'line_number': article['line_num'] + 1,
+                'matched_text': article['text']
+            })
+
+    return file_segments, unused_articles, len(potential_articles), len(index_lines), len(articles_in_sequences)
+
 # --- Main Execution ---
 
 def main():
@@ -445,35 +504,18 @@ def main():
     else:
         logging.info(f"Processing {len(markdown_files)} markdown files...")
 
-    for filepath in markdown_files:
-        filename = os.path.basename(filepath)
-        logging.info(f"Processing {filename}...")
-
-        potential_articles, lines = find_potential_articles(filepath)
-        if not lines:
-            continue
-
-        for article_candidate in potential_articles: article_candidate['filename'] = filename
-        total_potential_articles += len(potential_articles)
-
-        index_lines = detect_index(potential_articles, lines, filename)
-        total_index_articles += len(index_lines)
-
-        non_index_articles = [a for a in potential_articles if not a['is_index']]
-
-        articles_in_sequences = find_sequences(non_index_articles, filename)
-        total_used_in_sequence += len(articles_in_sequences)
-
-        file_segments = segment_content(filepath, lines, articles_in_sequences, index_lines)
-        all_segments.extend(file_segments)
-
-        for article in potential_articles:
-            if not article['is_index'] and not article['used_in_sequence']:
-                unused_articles_report.append({
-                    'filename': filename,
-                    'line_number': article['line_num'] + 1,
-                    'matched_text': article['text']
-                })
+    # Gazettes are independent of each other, so they are processed in worker processes;
+    # map() keeps the results in file order.
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for file_result in executor.map(process_gazette_file, markdown_files, chunksize=FILES_PER_WORKER_TASK):
+            if file_result is None:
+                continue
+            file_segments, file_unused_articles, num_potential, num_index, num_used = file_result
+            all_segments.extend(file_segments)
+            unused_articles_report.extend(file_unused_articles)
+            total_potential_articles += num_potential
+            total_index_articles += num_index
+            total_used_in_sequence += num_used
 
     # --- Output Results ---
     if all_segments:
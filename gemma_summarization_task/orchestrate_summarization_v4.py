@@ -1,32 +1,62 @@
 import os
 import sys
 import logging
+import logging.handlers
 import sqlite3
-import torch
-from transformers import AutoProcessor, Gemma3ForConditionalGeneration
 import argparse
-import datetime
+import atexit
+import time
 import csv
 import json
+import pickle
+import gzip
 import re
 import math
-from typing import List, Dict, Any
+import bisect
+import functools
+import itertools
+import queue
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import orjson  # optional: much faster results serialization
+except ImportError:
+    orjson = None
+try:
+    import msgpack  # optional: only needed for --format msgpack
+except ImportError:
+    msgpack = None
 
 # --- Environment Setup ---
 os.environ['TORCHDYNAMO_DISABLE'] = '1'
+# Let the Rust fast tokenizer encode batches of prompts on all cores.
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'true')
 
-# --- Dynamically add article_parser_utils to path and import ---
+# --- Dynamically add article_parser_utils to path; imported with the model libraries ---
 ARTICLE_PARSER_UTILS_PATH = "/mnt/data/AI4Deliberation/article_extraction_analysis"
 if ARTICLE_PARSER_UTILS_PATH not in sys.path:
     sys.path.append(ARTICLE_PARSER_UTILS_PATH)
-import article_parser_utils
+
+def import_workflow_dependencies():
+    """Imports torch, transformers and article_parser_utils into module globals.
+
+    Deferred until after argument parsing so `--help` and CLI errors return without
+    loading them; also guarantees the environment flags above are set first.
+    """
+    global torch, article_parser_utils
+    global AutoModelForCausalLM, AutoProcessor, AutoTokenizer, BatchEncoding, BitsAndBytesConfig, DynamicCache, Gemma3ForConditionalGeneration
+    import torch
+    from transformers import AutoModelForCausalLM, AutoProcessor, AutoTokenizer, BatchEncoding, BitsAndBytesConfig, DynamicCache, Gemma3ForConditionalGeneration
+    import article_parser_utils
 
 # --- Logger Setup ---
 try:
     SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 except NameError:  # e.g., running in Jupyter
     SCRIPT_DIR = os.getcwd()
-TIMESTAMP = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+OUTPUT_DIR = SCRIPT_DIR
+TIMESTAMP = time.strftime("%Y%m%d_%H%M%S")
 LOG_FILE_NAME = f"narrative_workflow_reasoning_trace_{TIMESTAMP}.log"
 LOG_FILE_PATH = os.path.join(SCRIPT_DIR, LOG_FILE_NAME)
 
@@ -37,18 +67,37 @@ reasoning_trace_logger = logging.getLogger("NarrativeReasoningTrace")
 reasoning_trace_logger.setLevel(logging.DEBUG)
 reasoning_trace_logger.propagate = False
 
-if not logger.hasHandlers():
-    file_handler = logging.FileHandler(LOG_FILE_PATH, mode='w')
+log_listener = None
+
+def setup_file_logging(log_file_path: str = LOG_FILE_PATH):
+    """Attaches the run's log file to both loggers through one queued writer thread.
+
+    Called from main() rather than at import, so importing the module (e.g. from tests)
+    writes nothing next to the script. Idempotent, like enable_debug_console_logging.
+    """
+    global log_listener
+    if log_listener is not None: return
+    file_handler = logging.FileHandler(log_file_path, mode='w')
     general_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(funcName)s - %(lineno)d - %(message)s')
     file_handler.setFormatter(general_formatter)
-    logger.addHandler(file_handler)
-    trace_file_handler = logging.FileHandler(LOG_FILE_PATH, mode='a')
+    trace_file_handler = logging.FileHandler(log_file_path, mode='a')
     reasoning_trace_formatter = logging.Formatter('%(message)s')
     trace_file_handler.setFormatter(reasoning_trace_formatter)
-    reasoning_trace_logger.addHandler(trace_file_handler)
-    logger.info(f"Narrative Workflow Logger initialized. Log file: {LOG_FILE_PATH}")
-
-logger.info(f"TORCHDYNAMO_DISABLE set to: {os.environ.get('TORCHDYNAMO_DISABLE')}")
+    # Both loggers enqueue records and one background listener thread writes them, so logging
+    # calls between generate() steps do not wait on disk. Name filters route each record to its
+    # own handler, and the single thread keeps the two streams in order within the shared file.
+    file_handler.addFilter(logging.Filter(logger.name))
+    trace_file_handler.addFilter(logging.Filter(reasoning_trace_logger.name))
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    reasoning_trace_logger.addHandler(queue_handler)
+    log_listener = logging.handlers.QueueListener(log_queue, file_handler, trace_file_handler)
+    log_listener.start()
+    # Flush anything still queued when the interpreter exits.
+    atexit.register(log_listener.stop)
+    logger.info(f"Narrative Workflow Logger initialized. Log file: {log_file_path}")
+    logger.info(f"TORCHDYNAMO_DISABLE set to: {os.environ.get('TORCHDYNAMO_DISABLE')}")
 
 # --- Constants ---
 DB_PATH = "/mnt/data/AI4Deliberation/deliberation_data_gr_MIGRATED_FRESH_20250602170747.db"
@@ -56,18 +105,51 @@ TABLE_NAME = "articles"
 TEXT_COLUMN_NAME = "content"
 TITLE_COLUMN_NAME = "title"
 ID_COLUMN_NAME = "id"
+FETCH_ARTICLES_SQL = f"SELECT {ID_COLUMN_NAME}, {TITLE_COLUMN_NAME}, {TEXT_COLUMN_NAME} FROM {TABLE_NAME} WHERE consultation_id = ?"
+FETCH_ARTICLE_BY_ID_SQL = FETCH_ARTICLES_SQL + f" AND {ID_COLUMN_NAME} = ?"
 MODEL_ID = "google/gemma-3-4b-it"
+# Optional small draft model (e.g. "google/gemma-3-1b-it") for speculative decoding of the long Stage 3
+# output. Off by default: its vocabulary differs from the target's, so generation has to translate
+# between the two tokenizers, which only pays off when measured on the deployment GPU.
+STAGE3_DRAFT_MODEL_ID = None
+QUANT = None  # None (bfloat16), "int8" or "int4" weight quantization via bitsandbytes
+# "sdpa" or "flash_attention_2"; flash-attn's variable-length kernels skip padding work but need a
+# supported GPU and a wheel matching the torch build, so it is opt-in.
+ATTN_IMPLEMENTATION = "sdpa"
 TITLE_RANGE_RE = re.compile(r"\(\s*(\d{1,3})\s*[–-]\s*(\d{1,3})\s*\)")
+# Gap-filling mention priority keyed by (is_start_of_line, is_quoted); lower is better.
+MENTION_PRIORITY = {(True, False): 1, (True, True): 2, (False, False): 3, (False, True): 4}
+
+# Endings that mark a response as complete; a tuple so str.endswith checks them in one call.
+END_PUNCTUATION = ('.', '?', '!', '."', '?"', '!"', '.»', '?»', '! »', ':')
 
 # --- Constants for Advanced Input Splitting & Rejoining ---
 MAX_SAFE_TOKENS_PER_CHUNK_PROMPT = 7000
 TARGET_TOKENS_FOR_INITIAL_CHUNK = 1000
 
+# Output buffer for the results JSON file
+RESULTS_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Parsed Stage 0 chunks buffered ahead of Stage 1 summarization
+STAGE0_CHUNK_QUEUE_SIZE = 32
+# Seconds the Stage 0 producer waits on a full queue before re-checking whether Stage 1 stopped
+STAGE0_QUEUE_PUT_TIMEOUT = 0.5
+
 # --- STRATEGIC TOKEN BUDGET FOR FINAL STAGE 2 OUTPUTS ---
 TARGET_REJOINED_S2_1_TOKENS = 2800
 TARGET_REJOINED_S2_2_TOKENS = 600
 TARGET_REJOINED_S2_3_TOKENS = 1200
 
+# Stage 2 sub-tasks: (stage id, combined-output section, results key, output token budget)
+STAGE2_SUBTASKS = (
+    ("2.1", "SUMMARY", "cohesive_summary_stage2_1", TARGET_REJOINED_S2_1_TOKENS),
+    ("2.2", "THEMES", "identified_themes_stage2_2", TARGET_REJOINED_S2_2_TOKENS),
+    ("2.3", "PLAN", "narrative_plan_stage2_3", TARGET_REJOINED_S2_3_TOKENS),
+)
+# Answer 2.1-2.3 in one sectioned generation when the summaries fit a single prompt.
+# Off by default: it changes the Stage 2 outputs compared with three separate calls.
+STAGE2_COMBINED_GENERATION = False
+
 # --- Prompt Templates ---
 # Recommended Greek System Prompt
 SYSTEM_PROMPT = "Είσαι ένας εξυπηρετικός βοηθός με εξειδίκευση στη δημιουργία σύντομων και περιεκτικών περιλήψεων."
@@ -97,6 +179,19 @@ STAGE2_3_NARRATIVE_PLAN_PROMPT_TEMPLATE = (
     "**Προσοχή: Δημιούργησε μόνο το σχέδιο της αφήγησης, όχι την ίδια την αφήγηση.**"
 )
 
+# Answers all three Stage 2 sub-tasks in one generation when the summaries fit a single prompt.
+STAGE2_COMBINED_PROMPT_TEMPLATE = (
+    "Με βάση τις παραπάνω περιλήψεις άρθρων μιας διαβούλευσης, ολοκλήρωσε τις τρεις παρακάτω εργασίες. "
+    "Γράψε την απάντηση κάθε εργασίας κάτω από τον αντίστοιχο δείκτη ενότητας, ακριβώς όπως εμφανίζεται, χωρίς άλλο κείμενο πριν ή μετά.\n\n"
+    "===SUMMARY===\n{cohesive_instructions}\n\n"
+    "===THEMES===\n{thematic_instructions}\n\n"
+    "===PLAN===\n{plan_instructions}"
+)
+STAGE2_COMBINED_SECTION_REGEX = re.compile(r"===(SUMMARY|THEMES|PLAN)===")
+
+# Single-pass Stage 2 prompts put the shared summaries first so 2.1/2.2/2.3 share a token prefix.
+STAGE2_SHARED_CONTEXT_HEADER = "ΠΕΡΙΛΗΨΕΙΣ ΑΡΘΡΩΝ:\n\n"
+
 STAGE2_X_MULTI_PART_SUFFIX = (
     "\n\nΠΡΟΣΟΧΗ: Τα παρακάτω κείμενα αποτελούν το ΜΕΡΟΣ {part_number} από {total_parts} ενός μεγαλύτερου συνόλου από ατομικές περιλήψεις. "
     "Ο στόχος σας είναι να επεξεργαστείτε **αυτό το συγκεκριμένο μέρος** σύμφωνα με τις αρχικές οδηγίες. "
@@ -158,6 +253,7 @@ ALL_PROMPT_TEMPLATES = {
     "STAGE2_1": STAGE2_1_COHESIVE_PROMPT_TEMPLATE,
     "STAGE2_2": STAGE2_2_THEMATIC_PROMPT_TEMPLATE,
     "STAGE2_3": STAGE2_3_NARRATIVE_PLAN_PROMPT_TEMPLATE,
+    "STAGE2_COMBINED": STAGE2_COMBINED_PROMPT_TEMPLATE,
     "STAGE2_X_MULTI_PART_SUFFIX": STAGE2_X_MULTI_PART_SUFFIX,
     "REJOIN_STAGE2_1": REJOIN_STAGE2_1_PROMPT_TEMPLATE,
     "REJOIN_STAGE2_2": REJOIN_STAGE2_2_PROMPT_TEMPLATE,
@@ -170,9 +266,18 @@ ALL_PROMPT_TEMPLATES = {
 
 def load_model_and_processor(model_id=MODEL_ID):
     logger.info(f"Attempting to load model and processor. Model ID: {model_id}")
+    quantization_config = None
+    if QUANT == "int8":
+        quantization_config = BitsAndBytesConfig(load_in_8bit=True)
+    elif QUANT == "int4":
+        quantization_config = BitsAndBytesConfig(load_in_4bit=True, bnb_4bit_quant_type="nf4", bnb_4bit_compute_dtype=torch.bfloat16)
+    elif QUANT is not None:
+        raise ValueError(f"Unsupported QUANT setting: {QUANT}")
+    logger.info(f"Weight quantization: {QUANT or 'none (bfloat16)'}, attention: {ATTN_IMPLEMENTATION}")
     try:
         model = Gemma3ForConditionalGeneration.from_pretrained(
-            model_id, device_map="auto", torch_dtype=torch.bfloat16, attn_implementation="sdpa"
+            model_id, device_map="auto", torch_dtype=torch.bfloat16, attn_implementation=ATTN_IMPLEMENTATION,
+            quantization_config=quantization_config
         ).eval()
         processor = AutoProcessor.from_pretrained(model_id)
         logger.info("Model and processor loaded successfully.")
@@ -181,57 +286,205 @@ def load_model_and_processor(model_id=MODEL_ID):
         logger.error(f"CRITICAL ERROR: {e}", exc_info=True)
         raise
 
+@functools.lru_cache(maxsize=1)
+def load_draft_model(draft_model_id):
+    """Loads the (model, tokenizer) pair used for speculative decoding once per process.
+
+    Returns None when no draft model is configured or it cannot be loaded.
+    """
+    if not draft_model_id:
+        return None
+    logger.info(f"Loading draft model for speculative decoding: {draft_model_id}")
+    try:
+        draft_model = AutoModelForCausalLM.from_pretrained(draft_model_id, device_map="auto", torch_dtype=torch.bfloat16).eval()
+        return draft_model, AutoTokenizer.from_pretrained(draft_model_id)
+    except Exception as e:
+        logger.warning(f"Could not load draft model {draft_model_id}, Stage 3 will decode without it: {e}")
+        return None
+
 def check_response_completeness(response_text):
     if not response_text: return False
-    end_punctuation = ['.', '?', '!', '."', '?"', '!"', '.»', '?»', '! »', ':']
-    return any(response_text.strip().endswith(punct) for punct in end_punctuation)
+    return response_text.rstrip().endswith(END_PUNCTUATION)
 
 def get_token_count(text, processor):
     if not processor or not text: return 0
     try:
+        # The Rust tokenizer returns the ids directly, skipping the BatchEncoding wrapper.
+        backend = getattr(processor.tokenizer, "backend_tokenizer", None)
+        if backend is not None:
+            return len(backend.encode(text).ids)
         return len(processor.tokenizer(text).input_ids)
     except Exception as e:
         logger.error(f"Error in get_token_count: {e}")
         return 0
 
+def get_token_counts(texts: List[str], processor) -> List[int]:
+    """Token counts for many texts with one encode_batch call; empty texts count as 0."""
+    if not processor or not texts: return [0] * len(texts)
+    backend = getattr(processor.tokenizer, "backend_tokenizer", None)
+    if backend is None:
+        return [get_token_count(text, processor) for text in texts]
+    try:
+        encodings = backend.encode_batch(list(texts))
+        return [len(encoding.ids) if text else 0 for text, encoding in zip(texts, encodings)]
+    except Exception as e:
+        logger.error(f"Error in get_token_counts: {e}")
+        return [0] * len(texts)
+
+def build_chat_messages(prompt_text: str) -> List[Dict[str, Any]]:
+    return [
+        {"role": "system", "content": [{"type": "text", "text": SYSTEM_PROMPT}]},
+        {"role": "user", "content": [{"type": "text", "text": prompt_text}]}
+    ]
+
+CHAT_USER_PLACEHOLDER = "<<USER_TEXT>>"
+
+@functools.lru_cache(maxsize=None)
+def chat_template_parts(processor, with_system_prompt: bool = True) -> Tuple[str, str]:
+    """Renders the chat template around a placeholder once and returns the (prefix, suffix) text."""
+    if with_system_prompt:
+        messages = build_chat_messages(CHAT_USER_PLACEHOLDER)
+    else:
+        messages = [{"role": "user", "content": [{"type": "text", "text": CHAT_USER_PLACEHOLDER}]}]
+    rendered = processor.apply_chat_template(messages, add_generation_prompt=True, tokenize=False)
+    prefix, suffix = rendered.split(CHAT_USER_PLACEHOLDER)
+    return prefix, suffix
+
+def tokenize_chat_prompt(processor, prompt_text: str, with_system_prompt: bool = True):
+    """Equivalent of apply_chat_template(..., tokenize=True) without re-running the Jinja template."""
+    prefix, suffix = chat_template_parts(processor, with_system_prompt)
+    # The Gemma template trims message text and already includes <bos>.
+    return processor.tokenizer(prefix + prompt_text.strip() + suffix, add_special_tokens=False, return_tensors="pt")
+
+def tokenize_chat_prompts(processor, prompt_texts: List[str]) -> "List[BatchEncoding]":
+    """Batch version of tokenize_chat_prompt: one fast-tokenizer call encodes a whole wave of prompts."""
+    prefix, suffix = chat_template_parts(processor, True)
+    encoded = processor.tokenizer([prefix + text.strip() + suffix for text in prompt_texts], add_special_tokens=False)
+    return [BatchEncoding({"input_ids": torch.tensor([ids]), "attention_mask": torch.ones((1, len(ids)), dtype=torch.long)})
+            for ids in encoded["input_ids"]]
+
+def build_shared_prefix_cache(model, processor, prompt_texts: List[str]):
+    """Prefills the longest token prefix shared by the rendered prompts once.
+
+    Returns (past_key_values, prefix_len) for summarize_text(prompt_cache=...), or None
+    when the prompts share nothing worth caching or the model does not fill a DynamicCache.
+    """
+    rendered = [tokenize_chat_prompt(processor, text)["input_ids"][0] for text in prompt_texts]
+    # Leave at least one uncached token per prompt for generate to process.
+    prefix_len = min(len(ids) for ids in rendered) - 1
+    first = rendered[0]
+    for ids in rendered[1:]:
+        mismatches = (first[:prefix_len] != ids[:prefix_len]).nonzero()
+        if len(mismatches):
+            prefix_len = int(mismatches[0])
+    if prefix_len <= 0:
+        return None
+    # An explicit DynamicCache: left to itself Gemma 3 builds a fixed-size hybrid cache,
+    # which generate() cannot extend as a prefix or crop back afterwards.
+    with torch.inference_mode():
+        prefix_outputs = model(input_ids=first[:prefix_len].unsqueeze(0).to(model.device),
+                               past_key_values=DynamicCache(), use_cache=True)
+    prefix_cache = prefix_outputs.past_key_values
+    if not isinstance(prefix_cache, DynamicCache):
+        logger.warning(f"Model returned a {type(prefix_cache).__name__} for the shared prefix; continuing without prefix caching.")
+        return None
+    logger.info(f"Prefilled shared prompt prefix of {prefix_len} tokens for {len(prompt_texts)} prompts.")
+    return prefix_cache, prefix_len
+
+def reset_prefix_cache(prompt_cache) -> None:
+    """Crops a shared prefix cache back to its prefix after generate() extended it in place."""
+    cached_kv, prefix_len = prompt_cache
+    try:
+        cached_kv.crop(prefix_len)
+    except Exception as e:
+        # Left longer than prefix_len, the cache is skipped by later calls.
+        logger.warning(f"Could not roll back the shared prefix cache: {e}")
+
+def generate_first_pass(model, processor, stage_id: str, inputs, max_new_tokens: int, prompt_cache=None, draft=None):
+    """Runs summarize_text's first generate() with the optional shared prefix cache and draft model.
+
+    Both only speed up greedy decoding without changing its output, so if generation with
+    either fails the call is retried without them rather than failing the summary.
+    """
+    generate_kwargs = {}
+    if prompt_cache is not None:
+        cached_kv, prefix_len = prompt_cache
+        # generate() only prefills the tokens after the cached prefix.
+        if cached_kv.get_seq_length() == prefix_len:
+            generate_kwargs["past_key_values"] = cached_kv
+            logger.debug("[%s] Reusing %d cached prefix tokens.", stage_id, prefix_len)
+        else:
+            logger.warning(f"[{stage_id}] Shared prefix cache was not rolled back; generating without it.")
+    if draft is not None:
+        draft_model, draft_tokenizer = draft
+        # The draft's vocabulary differs from the target's, so generate() needs both tokenizers
+        # to translate candidate tokens between them.
+        generate_kwargs.update(assistant_model=draft_model, tokenizer=processor.tokenizer, assistant_tokenizer=draft_tokenizer)
+    try:
+        with torch.inference_mode():
+            return model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False,
+                                  return_dict_in_generate=True, **generate_kwargs)
+    except Exception as e:
+        if not generate_kwargs:
+            raise
+        logger.warning(f"[{stage_id}] Generation with the prefix cache or draft model failed, retrying without them: {e}")
+        if "past_key_values" in generate_kwargs:
+            reset_prefix_cache(prompt_cache)
+    with torch.inference_mode():
+        return model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False, return_dict_in_generate=True)
+
 def summarize_text(model, processor, stage_id: str, initial_llm_prompt_text: str,
                    core_input_data_for_correction: str, original_task_instructions_for_correction: str,
-                   target_tokens_for_summary: int):
+                   target_tokens_for_summary: int, prompt_cache=None, pretokenized_inputs=None, draft=None):
     reasoning_trace_logger.info(f"\n{'='*80}\nSTAGE {stage_id} - CALL\n{'='*80}\nPROMPT:\n{initial_llm_prompt_text}\n{'-'*40}")
     if not initial_llm_prompt_text or not initial_llm_prompt_text.strip():
         logger.warning(f"[{stage_id}] Skipping due to empty prompt.")
         return "[SKIPPED: EMPTY PROMPT]"
 
-    messages = [
-        {"role": "system", "content": [{"type": "text", "text": SYSTEM_PROMPT}]},
-        {"role": "user", "content": [{"type": "text", "text": initial_llm_prompt_text}]}
-    ]
     try:
-        inputs = processor.apply_chat_template(messages, add_generation_prompt=True, tokenize=True, return_dict=True, return_tensors="pt").to(model.device)
+        if pretokenized_inputs is None:
+            pretokenized_inputs = tokenize_chat_prompt(processor, initial_llm_prompt_text)
+        inputs = pretokenized_inputs.to(model.device)
         input_len = inputs["input_ids"].shape[-1]
-        with torch.inference_mode():
-            outputs = model.generate(**inputs, max_new_tokens=target_tokens_for_summary, do_sample=False)
-        decoded_summary = processor.decode(outputs[0][input_len:], skip_special_tokens=True)
+        outputs = generate_first_pass(model, processor, stage_id, inputs, target_tokens_for_summary, prompt_cache, draft)
+        generated_ids = outputs.sequences[0][input_len:]
+        decoded_summary = processor.decode(generated_ids, skip_special_tokens=True)
         
         if not check_response_completeness(decoded_summary):
-            logger.warning(f"[{stage_id}] Response may be truncated. Attempting continuation.")
-            continuation_prompt = CONCISE_CONTINUATION_PROMPT_TEMPLATE.format(
-                original_task_instructions=original_task_instructions_for_correction,
-                original_input_data=core_input_data_for_correction,
-                truncated_response=decoded_summary
-            )
-            cont_messages = [{"role": "user", "content": [{"type": "text", "text": continuation_prompt}]}]
-            cont_inputs = processor.apply_chat_template(cont_messages, add_generation_prompt=True, tokenize=True, return_dict=True, return_tensors="pt").to(model.device)
-            cont_input_len = cont_inputs["input_ids"].shape[-1]
-            with torch.inference_mode():
-                cont_outputs = model.generate(**cont_inputs, max_new_tokens=200, do_sample=False)
-            continuation_fragment = processor.decode(cont_outputs[0][cont_input_len:], skip_special_tokens=True)
+            continuation_fragment = None
+            if generated_ids.shape[-1] >= target_tokens_for_summary:
+                # Cut off by the token limit: keep decoding from the KV cache of the first call
+                # instead of re-prefilling the prompt, input and partial answer.
+                logger.warning(f"[{stage_id}] Response hit the token limit. Continuing from cached state.")
+                try:
+                    with torch.inference_mode():
+                        cont_outputs = model.generate(input_ids=outputs.sequences, attention_mask=torch.ones_like(outputs.sequences),
+                                                      past_key_values=outputs.past_key_values, max_new_tokens=200, do_sample=False)
+                    continuation_fragment = processor.decode(cont_outputs[0][outputs.sequences.shape[-1]:], skip_special_tokens=True)
+                except Exception as e:
+                    logger.warning(f"[{stage_id}] Cached continuation failed, falling back to re-prompting: {e}")
+            if continuation_fragment is None:
+                logger.warning(f"[{stage_id}] Response may be truncated. Attempting continuation.")
+                continuation_prompt = CONCISE_CONTINUATION_PROMPT_TEMPLATE.format(
+                    original_task_instructions=original_task_instructions_for_correction,
+                    original_input_data=core_input_data_for_correction,
+                    truncated_response=decoded_summary
+                )
+                cont_inputs = tokenize_chat_prompt(processor, continuation_prompt, with_system_prompt=False).to(model.device)
+                cont_input_len = cont_inputs["input_ids"].shape[-1]
+                with torch.inference_mode():
+                    cont_outputs = model.generate(**cont_inputs, max_new_tokens=200, do_sample=False)
+                continuation_fragment = processor.decode(cont_outputs[0][cont_input_len:], skip_special_tokens=True)
             decoded_summary += continuation_fragment
         
         final_output = decoded_summary
     except Exception as e:
         logger.error(f"[{stage_id}] Error during summarization: {e}", exc_info=True)
         final_output = f"[ERROR SUMMARIZING: {e}]"
+    finally:
+        if prompt_cache is not None:
+            # Generation extends the shared cache in place; the other Stage 2 calls need only the prefix.
+            reset_prefix_cache(prompt_cache)
 
     reasoning_trace_logger.info(f"OUTPUT:\n{final_output}\n{'='*80}\n")
     return final_output
@@ -244,72 +497,119 @@ def summarize_chunk_stage1(model, processor, chunk_data: Dict[str, Any]):
     prompt = f"{ALL_PROMPT_TEMPLATES['STAGE1']}\n\nΤίτλος Ενότητας: {chunk_title}\n\nΚείμενο Ενότητας:\n{content}"
     return summarize_text(model, processor, "1", prompt, content, ALL_PROMPT_TEMPLATES['STAGE1'], 300)
 
+_db_connection = None
+_db_connection_path = None
+
+def get_db_connection():
+    """Returns a process-wide connection to DB_PATH, reopening it if DB_PATH changed.
+
+    Reusing one connection lets sqlite3's statement cache skip re-preparing the fetch queries.
+    """
+    global _db_connection, _db_connection_path
+    if _db_connection is None or _db_connection_path != DB_PATH:
+        if _db_connection is not None:
+            _db_connection.close()
+        # Autocommit: the workflow only reads, so no implicit transactions are opened.
+        _db_connection = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False)
+        _db_connection_path = DB_PATH
+        # Per-connection settings only: journal_mode would be persisted into the shared database file.
+        for pragma in ("PRAGMA cache_size=-65536", "PRAGMA temp_store=MEMORY", "PRAGMA mmap_size=268435456"):
+            try:
+                _db_connection.execute(pragma)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not apply '{pragma}': {e}")
+    return _db_connection
+
 def fetch_articles_for_consultation(consultation_id, article_db_id=None):
     logger.info(f"Fetching DB articles for consultation_id: {consultation_id}")
     data = []
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            query = f"SELECT {ID_COLUMN_NAME}, {TITLE_COLUMN_NAME}, {TEXT_COLUMN_NAME} FROM {TABLE_NAME} WHERE consultation_id = ?"
-            params = [consultation_id]
-            if article_db_id:
-                query += f" AND {ID_COLUMN_NAME} = ?"
-                params.append(article_db_id)
-            cursor.execute(query, params)
-            for row in cursor.fetchall():
-                data.append({'id': row[0], 'title': row[1], 'content': row[2]})
+        conn = get_db_connection()
+        if article_db_id:
+            rows = conn.execute(FETCH_ARTICLE_BY_ID_SQL, (consultation_id, article_db_id))
+        else:
+            rows = conn.execute(FETCH_ARTICLES_SQL, (consultation_id,))
+        for row in rows:
+            data.append({'id': row[0], 'title': row[1], 'content': row[2]})
     except sqlite3.Error as e:
         logger.error(f"DB error: {e}", exc_info=True)
     return data
 
 # --- Corrected Stage 0 Article Parsing Logic ---
 
-def parse_db_article_title_range(db_article_title: str) -> List[int]:
+def parse_db_article_title_range(db_article_title: str) -> range:
     """Parses a numeric range (e.g., Άρθρα 1-5) from a DB article title string."""
-    m = TITLE_RANGE_RE.search(db_article_title or "")
+    # Most titles carry no parenthesised range; skip the regex for them.
+    paren_pos = (db_article_title or "").find("(")
+    if paren_pos == -1:
+        return range(0)
+    m = TITLE_RANGE_RE.search(db_article_title, paren_pos)
     if not m:
-        return []
+        return range(0)
     try:
         start, end = int(m.group(1)), int(m.group(2))
-        return list(range(start, end + 1)) if start <= end else []
+        return range(start, end + 1)
     except ValueError:
-        return []
+        return range(0)
 
-def find_and_prioritize_mentions_for_gaps(text_content: str, needed_numbers: List[int]) -> List[Dict[str, Any]]:
-    """Finds all mentions for needed_numbers in text and returns a list of chosen mentions with priority."""
+def find_and_prioritize_mentions_for_gaps(text_content: str, needed_numbers: List[int], all_mentions_in_text: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Finds all mentions for needed_numbers in text and returns a list of chosen mentions with priority.
+
+    all_mentions_in_text, when given, is the result of find_all_article_mentions(text_content)
+    already computed by the caller, so the text is not scanned again.
+    """
     if not needed_numbers or not text_content:
         return []
     
     needed_set = set(needed_numbers)
-    candidate_mentions_for_needed_numbers: Dict[int, Dict[str, Any]] = {}
+    # article number -> (priority, mention); the stored dict is only built for the winners.
+    best_mention_for_number: Dict[int, Tuple[int, Dict[str, Any]]] = {}
 
-    all_mentions_in_text = article_parser_utils.find_all_article_mentions(text_content))
-    logger.debug(f"Found {len(all_mentions_in_text)} total mentions in text for gap filling.")
+    if all_mentions_in_text is None:
+        all_mentions_in_text = article_parser_utils.find_all_article_mentions(text_content)
+    logger.debug("Found %d total mentions in text for gap filling.", len(all_mentions_in_text))
 
+    unresolved_numbers = set(needed_set)
     for mention_details in all_mentions_in_text:
-        parsed_mention_info = mention_details.get("parsed_details", {})
-        article_num_of_mention = parsed_mention_info.get("main_number")
+        article_num_of_mention = mention_details.get("parsed_details", {}).get("main_number")
 
-        if article_num_of_mention is None or article_num_of_mention not in needed_set:
+        if article_num_of_mention not in needed_set:
             continue
 
-        priority = 4
-        if mention_details.get("is_start_of_line") and not mention_details.get("is_quoted"):
-            priority = 1
-        elif mention_details.get("is_start_of_line") and mention_details.get("is_quoted"):
-            priority = 2
-        elif not mention_details.get("is_start_of_line") and not mention_details.get("is_quoted"):
-            priority = 3
+        priority = MENTION_PRIORITY[(bool(mention_details.get("is_start_of_line")), bool(mention_details.get("is_quoted")))]
         
-        current_best_mention_for_num = candidate_mentions_for_needed_numbers.get(article_num_of_mention)
-        if current_best_mention_for_num is None or priority < current_best_mention_for_num.get("priority", 5):
-            mention_to_store = mention_details.copy()
-            mention_to_store["priority"] = priority
-            mention_to_store["parsed_info"] = parsed_mention_info 
-            candidate_mentions_for_needed_numbers[article_num_of_mention] = mention_to_store
-            logger.debug(f"Chose mention for article {article_num_of_mention} (Prio: {priority}): '{mention_details.get('match_text')}'")
-
-    return list(candidate_mentions_for_needed_numbers.values())
+        current_best = best_mention_for_number.get(article_num_of_mention)
+        if current_best is None or priority < current_best[0]:
+            best_mention_for_number[article_num_of_mention] = (priority, mention_details)
+            logger.debug("Chose mention for article %s (Prio: %s): '%s'", article_num_of_mention, priority, mention_details.get('match_text'))
+            if priority == 1:
+                # Nothing can beat a start-of-line, unquoted mention.
+                unresolved_numbers.discard(article_num_of_mention)
+                if not unresolved_numbers:
+                    break
+
+    chosen_mentions = []
+    for priority, mention_details in best_mention_for_number.values():
+        mention_to_store = dict(mention_details, priority=priority)
+        mention_to_store["parsed_info"] = mention_details.get("parsed_details", {})
+        # 1-based line number expected by reconstruct_article_chunks_with_prioritized_mentions.
+        mention_to_store["line_number"] = mention_details.get("line_index", -1) + 1
+        chosen_mentions.append(mention_to_store)
+    return chosen_mentions
+
+def header_match_offset(raw_line: str, match_text: str) -> int:
+    """Offset of a header match within its original line.
+
+    Headers are matched on the stripped line, so the match normally begins right after the
+    leading whitespace; that is checked directly before falling back to a full search.
+    """
+    if not raw_line or not match_text:
+        return 0
+    # Most header lines have no indentation, so lstrip() (and its copy) is only paid when they do.
+    strip_offset = len(raw_line) - len(raw_line.lstrip()) if raw_line[0].isspace() else 0
+    if not match_text[0].isspace() and raw_line.startswith(match_text, strip_offset):
+        return strip_offset
+    return max(0, raw_line.find(match_text))
 
 def get_internally_completed_chunks_for_db_article(db_article_content: str, db_article_title: str) -> List[Dict[str, Any]]:
     """
@@ -320,36 +620,40 @@ def get_internally_completed_chunks_for_db_article(db_article_content: str, db_a
         logger.info("DB article content is empty. Returning no chunks.")
         return []
 
-    logger.debug(f"Starting internal completion for DB article. Title: '{db_article_title}'")
+    logger.debug("Starting internal completion for DB article. Title: '%s'", db_article_title)
     
     try:
         true_headers_locations = article_parser_utils._get_true_main_article_header_locations(db_article_content)
         initial_sequence_numbers = sorted({h_loc.get("article_number") for h_loc in true_headers_locations if h_loc.get("article_number") is not None})
         
         mentions_for_reconstruction = []
+        # Mentions are scanned at most once per article and shared by the title and internal gap passes.
+        all_mentions = None
         expected_numbers_from_title = parse_db_article_title_range(db_article_title)
         
         if expected_numbers_from_title:
-            missing_compared_to_title = sorted(list(set(expected_numbers_from_title) - set(initial_sequence_numbers)))
+            missing_compared_to_title = sorted(set(expected_numbers_from_title).difference(initial_sequence_numbers))
             if missing_compared_to_title:
-                mentions_for_title_gaps = find_and_prioritize_mentions_for_gaps(db_article_content, missing_compared_to_title)
+                all_mentions = article_parser_utils.find_all_article_mentions(db_article_content)
+                mentions_for_title_gaps = find_and_prioritize_mentions_for_gaps(db_article_content, missing_compared_to_title, all_mentions)
                 mentions_for_reconstruction.extend(mentions_for_title_gaps)
                 found_numbers = {m['parsed_info'].get('main_number') for m in mentions_for_title_gaps if m.get('parsed_info')}
-                initial_sequence_numbers = sorted(list(set(initial_sequence_numbers).union(found_numbers)))
-
-        internal_gaps_to_fill = []
-        if len(initial_sequence_numbers) >= 2:
-            for i in range(len(initial_sequence_numbers) - 1):
-                start, end = initial_sequence_numbers[i], initial_sequence_numbers[i+1]
-                if end > start + 1:
-                    internal_gaps_to_fill.extend(range(start + 1, end))
-        
-        if internal_gaps_to_fill:
-            current_mention_numbers = {m['parsed_info'].get('main_number') for m in mentions_for_reconstruction if m.get('parsed_info')}
-            needed_gaps = sorted(list(set(internal_gaps_to_fill) - current_mention_numbers))
-            if needed_gaps:
-                mentions_for_internal_gaps = find_and_prioritize_mentions_for_gaps(db_article_content, needed_gaps)
-                mentions_for_reconstruction.extend(mentions_for_internal_gaps)
+                initial_sequence_numbers = sorted(found_numbers.union(initial_sequence_numbers))
+
+        # Gap ranges between consecutive numbers are expanded lazily; since the sequence is
+        # sorted and unique, the surviving numbers come out sorted without a set or a sort.
+        current_mention_numbers = {m['parsed_info'].get('main_number') for m in mentions_for_reconstruction if m.get('parsed_info')}
+        needed_gaps = [
+            num
+            for start, end in zip(initial_sequence_numbers, initial_sequence_numbers[1:])
+            for num in range(start + 1, end)
+            if num not in current_mention_numbers
+        ]
+        if needed_gaps:
+            if all_mentions is None:
+                all_mentions = article_parser_utils.find_all_article_mentions(db_article_content)
+            mentions_for_internal_gaps = find_and_prioritize_mentions_for_gaps(db_article_content, needed_gaps, all_mentions)
+            mentions_for_reconstruction.extend(mentions_for_internal_gaps)
 
         main_delimiters = []
         for h_loc in true_headers_locations:
@@ -359,19 +663,15 @@ def get_internally_completed_chunks_for_db_article(db_article_content: str, db_a
                 "line_num": h_loc.get("line_index", -1) + 1,
                 "parsed_header": h_loc.get("parsed_header_details_copy", {}),
                 "raw_header_line": match_text, 
-                "char_offset_in_original_line": raw_line.find(match_text) if raw_line and match_text else 0
+                "char_offset_in_original_line": header_match_offset(raw_line, match_text)
             })
 
-        formatted_mentions = []
-        for m in mentions_for_reconstruction:
-            mention_copy = m.copy()
-            mention_copy["line_number"] = m.get("line_index", -1) + 1
-            formatted_mentions.append(mention_copy)
-        
+        # Mentions are fresh dicts from find_and_prioritize_mentions_for_gaps, already carrying
+        # line_number, so they are passed through without another copy.
         reconstructed_chunks = article_parser_utils.reconstruct_article_chunks_with_prioritized_mentions(
             original_text=db_article_content,
             main_header_locations=main_delimiters,
-            prioritized_mentions_input=formatted_mentions
+            prioritized_mentions_input=mentions_for_reconstruction
         )
 
         if not reconstructed_chunks:
@@ -388,11 +688,21 @@ def get_internally_completed_chunks_for_db_article(db_article_content: str, db_a
 
 # --- NEW HELPER FUNCTIONS FOR SCALABLE STAGE 2 PROCESSING ---
 
+@functools.lru_cache(maxsize=4)
+def summary_token_prefix_sums(summaries: Tuple[str, ...], processor: Any) -> Tuple[int, ...]:
+    """Cumulative token counts (separator included), with a leading 0; shared by Stages 2.1-2.3."""
+    separator_tokens = get_token_count("\n\n---\n\n", processor)
+    lengths = (count + separator_tokens for count in get_token_counts(summaries, processor))
+    return tuple(itertools.accumulate(lengths, initial=0))
+
 def smart_chunk_summaries(
     summaries_list: List[str], base_prompt_text: str, part_suffix_template: str,
     max_prompt_tokens: int, processor: Any, overlap: int = 1
-) -> List[List[str]]:
-    """Splits a list of summaries into the minimum number of chunks required."""
+) -> List[Tuple[int, int]]:
+    """Splits a list of summaries into the minimum number of chunks required.
+
+    Returns (start, end) index ranges into summaries_list rather than copied sublists.
+    """
     if not summaries_list: return []
     
     system_prompt_tokens = get_token_count(SYSTEM_PROMPT, processor)
@@ -404,30 +714,69 @@ def smart_chunk_summaries(
         logger.error("Prompt overhead exceeds max tokens per chunk. Cannot create chunks.")
         return []
 
+    cumulative_tokens = summary_token_prefix_sums(tuple(summaries_list), processor)
     split_indices = [0]
-    current_tokens = 0
-    for i, summary in enumerate(summaries_list):
-        summary_tokens = get_token_count(summary, processor) + get_token_count("\n\n---\n\n", processor)
-        if current_tokens + summary_tokens > max_content_tokens and i > split_indices[-1]:
-            split_indices.append(i)
-            current_tokens = 0
-        current_tokens += summary_tokens
+    while True:
+        start = split_indices[-1]
+        # Largest end with cumulative_tokens[end] - cumulative_tokens[start] <= max_content_tokens,
+        # but always at least one summary per chunk.
+        end = max(bisect.bisect_right(cumulative_tokens, cumulative_tokens[start] + max_content_tokens) - 1, start + 1)
+        if end >= len(summaries_list):
+            break
+        split_indices.append(end)
 
     all_chunks = []
     for i in range(len(split_indices)):
         start_index = split_indices[i]
         if i > 0: start_index = max(0, start_index - overlap)
         end_index = split_indices[i+1] if i + 1 < len(split_indices) else len(summaries_list)
-        all_chunks.append(summaries_list[start_index:end_index])
+        all_chunks.append((start_index, end_index))
 
     logger.info(f"Smart chunking split {len(summaries_list)} summaries into {len(all_chunks)} chunks.")
     return all_chunks
 
+def build_stage2_single_pass_prompt(base_prompt_text: str, full_content_text: str) -> str:
+    return STAGE2_SHARED_CONTEXT_HEADER + full_content_text + "\n\n---\n\n" + base_prompt_text
+
+def process_stage2_combined(all_individual_summaries: List[str], model: Any, processor: Any,
+                            all_templates: Dict[str, str], max_chunk_prompt_tokens: int) -> Optional[Dict[str, str]]:
+    """Runs Stages 2.1-2.3 as one sectioned generation over a single prefill of the summaries.
+
+    Returns the sections that parsed, keyed by result name, or None when the content does not
+    fit a single prompt. The caller regenerates any sub-task missing from the result.
+    """
+    full_content_text = "\n\n---\n\n".join(all_individual_summaries)
+    combined_instructions = all_templates["STAGE2_COMBINED"].format(
+        cohesive_instructions=all_templates["STAGE2_1"],
+        thematic_instructions=all_templates["STAGE2_2"],
+        plan_instructions=all_templates["STAGE2_3"]
+    )
+    combined_prompt = build_stage2_single_pass_prompt(combined_instructions, full_content_text)
+    estimated_tokens = get_token_count(SYSTEM_PROMPT + combined_prompt, processor)
+    if estimated_tokens > max_chunk_prompt_tokens:
+        return None
+
+    logger.info(f"--- Starting combined Stage 2 processing ({estimated_tokens} prompt tokens) ---")
+    combined_output = summarize_text(model, processor, "2.x_combined", combined_prompt, full_content_text, combined_instructions,
+                                     TARGET_REJOINED_S2_1_TOKENS + TARGET_REJOINED_S2_2_TOKENS + TARGET_REJOINED_S2_3_TOKENS)
+    pieces = STAGE2_COMBINED_SECTION_REGEX.split(combined_output)
+    sections = {name: body.strip() for name, body in zip(pieces[1::2], pieces[2::2])}
+    parsed_results = {result_key: sections[section] for _, section, result_key, _ in STAGE2_SUBTASKS if sections.get(section)}
+    if len(parsed_results) < len(STAGE2_SUBTASKS):
+        missing_sections = [section for _, section, result_key, _ in STAGE2_SUBTASKS if result_key not in parsed_results]
+        logger.warning(f"Combined Stage 2 output is missing {missing_sections}. Regenerating only those with separate calls.")
+    return parsed_results
+
 def process_and_rejoin_stage(
     stage_id_prefix: str, all_individual_summaries: List[str], model: Any, processor: Any,
-    all_templates: Dict[str, str], max_chunk_prompt_tokens: int, final_target_output_tokens: int, dry_run: bool = False
+    all_templates: Dict[str, str], max_chunk_prompt_tokens: int, final_target_output_tokens: int, dry_run: bool = False,
+    prompt_cache=None
 ) -> str:
-    """Orchestrates dynamic chunking and hierarchical rejoining for a Stage 2 sub-task."""
+    """Orchestrates dynamic chunking and hierarchical rejoining for a Stage 2 sub-task.
+
+    prompt_cache, when given, holds the prefilled summaries prefix shared with the other
+    Stage 2 sub-tasks and is only used on the single-pass path.
+    """
     stage_name = f"Stage {stage_id_prefix}"
     logger.info(f"--- Starting {stage_name} Processing ---")
 
@@ -442,40 +791,47 @@ def process_and_rejoin_stage(
 
     if estimated_tokens <= max_chunk_prompt_tokens:
         logger.info(f"{stage_name} input ({estimated_tokens} tokens) is small enough. Processing as single part.")
-        return summarize_text(model, processor, f"{stage_id_prefix}_single_pass", base_prompt_text + "\n\n" + full_content_text,
-                              full_content_text, base_prompt_text, final_target_output_tokens)
+        return summarize_text(model, processor, f"{stage_id_prefix}_single_pass", build_stage2_single_pass_prompt(base_prompt_text, full_content_text),
+                              full_content_text, base_prompt_text, final_target_output_tokens, prompt_cache=prompt_cache)
 
     summary_chunks = smart_chunk_summaries(all_individual_summaries, base_prompt_text, all_templates["STAGE2_X_MULTI_PART_SUFFIX"],
                                            max_chunk_prompt_tokens, processor, overlap=1)
     
     if len(summary_chunks) <= 1:
         logger.info(f"{stage_name} chunking resulted in one chunk. Processing as single part.")
-        return summarize_text(model, processor, f"{stage_id_prefix}_single_pass", base_prompt_text + "\n\n" + full_content_text,
+        return summarize_text(model, processor, f"{stage_id_prefix}_single_pass", build_stage2_single_pass_prompt(base_prompt_text, full_content_text),
                               full_content_text, base_prompt_text, final_target_output_tokens)
     
-    processing_queue = []
-    for i, chunk_list in enumerate(summary_chunks):
+    part_prompts = []
+    for i, (start_index, end_index) in enumerate(summary_chunks):
         part_number = i + 1
-        chunk_content = "\n\n---\n\n".join(chunk_list)
+        chunk_content = "\n\n---\n\n".join(itertools.islice(all_individual_summaries, start_index, end_index))
         part_suffix = all_templates["STAGE2_X_MULTI_PART_SUFFIX"].format(part_number=part_number, total_parts=len(summary_chunks))
-        prompt_for_part = base_prompt_text + part_suffix + "\n\n" + chunk_content
+        part_prompts.append((part_number, base_prompt_text + part_suffix + "\n\n" + chunk_content, chunk_content, base_prompt_text + part_suffix))
+    part_inputs = tokenize_chat_prompts(processor, [prompt for _, prompt, _, _ in part_prompts])
+    processing_queue = []
+    for (part_number, prompt_for_part, chunk_content, part_instructions), inputs in zip(part_prompts, part_inputs):
         processing_queue.append(summarize_text(model, processor, f"{stage_id_prefix}_part_{part_number}", prompt_for_part,
-                                               chunk_content, base_prompt_text + part_suffix, TARGET_TOKENS_FOR_INITIAL_CHUNK))
+                                               chunk_content, part_instructions, TARGET_TOKENS_FOR_INITIAL_CHUNK,
+                                               pretokenized_inputs=inputs))
 
     rejoin_round = 1
     rejoin_prompt_template = all_templates[f"REJOIN_STAGE{stage_id_prefix.replace('.', '_')}"]
     while len(processing_queue) > 1:
         logger.info(f"Starting {stage_name} Rejoining Round {rejoin_round} with {len(processing_queue)} items.")
+        wave_prompts = []
+        for i in range(0, len(processing_queue) - 1, 2):
+            part_a, part_b = processing_queue[i], processing_queue[i+1]
+            rejoin_keys = {"2.1": {"summary_part_a": part_a, "summary_part_b": part_b}, "2.2": {"themes_part_a": part_a, "themes_part_b": part_b}, "2.3": {"plan_part_a": part_a, "plan_part_b": part_b}}
+            wave_prompts.append((rejoin_prompt_template.format(**rejoin_keys[stage_id_prefix]), f"Part A:{part_a}\nPart B:{part_b}"))
+        wave_inputs = tokenize_chat_prompts(processor, [prompt for prompt, _ in wave_prompts])
         next_queue = []
-        for i in range(0, len(processing_queue), 2):
-            if i + 1 < len(processing_queue):
-                part_a, part_b = processing_queue[i], processing_queue[i+1]
-                rejoin_keys = {"2.1": {"summary_part_a": part_a, "summary_part_b": part_b}, "2.2": {"themes_part_a": part_a, "themes_part_b": part_b}, "2.3": {"plan_part_a": part_a, "plan_part_b": part_b}}
-                rejoin_prompt = rejoin_prompt_template.format(**rejoin_keys[stage_id_prefix])
-                next_queue.append(summarize_text(model, processor, f"{stage_id_prefix}_rejoin_r{rejoin_round}", rejoin_prompt,
-                                                 f"Part A:{part_a}\nPart B:{part_b}", "Rejoin two parts.", final_target_output_tokens))
-            else:
-                next_queue.append(processing_queue[i])
+        for (rejoin_prompt, core_input), inputs in zip(wave_prompts, wave_inputs):
+            next_queue.append(summarize_text(model, processor, f"{stage_id_prefix}_rejoin_r{rejoin_round}", rejoin_prompt,
+                                             core_input, "Rejoin two parts.", final_target_output_tokens,
+                                             pretokenized_inputs=inputs))
+        if len(processing_queue) % 2:
+            next_queue.append(processing_queue[-1])
         processing_queue = next_queue
         rejoin_round += 1
 
@@ -487,6 +843,7 @@ def process_and_rejoin_stage(
 def run_narrative_summarization_workflow(consultation_id, article_db_id_to_process=None, dry_run=False):
     logger.info(f"Starting narrative workflow for consultation_id: {consultation_id}, dry_run: {dry_run}")
     results = {"consultation_id": consultation_id, "errors": [], "stages_completed": []}
+    import_workflow_dependencies()
     model, processor = load_model_and_processor()
 
     logger.info("--- Starting Stage 0: Article Fetching and Chunking ---")
@@ -495,27 +852,78 @@ def run_narrative_summarization_workflow(consultation_id, article_db_id_to_proce
         results["errors"].append(f"No articles found for consultation_id {consultation_id}.")
         return results
     
-    article_chunks_to_process = []
-    for article in db_articles:
-        chunks = get_internally_completed_chunks_for_db_article(article['content'], article['title'])
-        article_chunks_to_process.extend(chunks)
-    
-    if not article_chunks_to_process:
+    # Stage 0 parsing runs in a background thread and feeds Stage 1 through a bounded queue,
+    # so CPU-side parsing overlaps with GPU-side summarization.
+    chunk_queue = queue.Queue(maxsize=STAGE0_CHUNK_QUEUE_SIZE)
+    # Set when Stage 1 stops consuming, so the producer never blocks on a queue nobody drains.
+    stage1_stopped = threading.Event()
+    stage0_errors = []
+
+    def enqueue_chunk(chunk) -> bool:
+        """Puts chunk on the queue; returns False instead if Stage 1 has stopped."""
+        while not stage1_stopped.is_set():
+            try:
+                chunk_queue.put(chunk, timeout=STAGE0_QUEUE_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce_article_chunks():
+        try:
+            for article in db_articles:
+                for chunk in get_internally_completed_chunks_for_db_article(article['content'], article['title']):
+                    if not enqueue_chunk(chunk):
+                        return
+        except Exception as e:
+            stage0_errors.append(e)
+        finally:
+            enqueue_chunk(None)
+
+    producer = threading.Thread(target=produce_article_chunks, name="stage0-parser", daemon=True)
+    producer.start()
+
+    logger.info("--- Starting Stage 1: Individual Summaries (pipelined with Stage 0) ---")
+    all_individual_summaries = []
+    try:
+        while (chunk := chunk_queue.get()) is not None:
+            logger.info(f"Summarizing chunk {len(all_individual_summaries) + 1} (Stage 0 still parsing: {producer.is_alive()})")
+            all_individual_summaries.append(summarize_chunk_stage1(model, processor, chunk))
+    finally:
+        stage1_stopped.set()
+        producer.join()
+    if stage0_errors:
+        raise stage0_errors[0]
+
+    if not all_individual_summaries:
         results["errors"].append("No processable article chunks found.")
         return results
-    results["stages_completed"].append(f"Stage 0: Fetched and parsed into {len(article_chunks_to_process)} article chunks")
-
-    logger.info("--- Starting Stage 1: Individual Summaries ---")
-    all_individual_summaries = []
-    for i, chunk in enumerate(article_chunks_to_process):
-        logger.info(f"Summarizing chunk {i+1}/{len(article_chunks_to_process)}")
-        all_individual_summaries.append(summarize_chunk_stage1(model, processor, chunk))
+    results["stages_completed"].append(f"Stage 0: Fetched and parsed into {len(all_individual_summaries)} article chunks")
     results["all_individual_summaries_text"] = "\n\n---\n\n".join(all_individual_summaries)
     results["stages_completed"].append(f"Stage 1: Generated {len(all_individual_summaries)} summaries")
 
-    results["cohesive_summary_stage2_1"] = process_and_rejoin_stage("2.1", all_individual_summaries, model, processor, ALL_PROMPT_TEMPLATES, MAX_SAFE_TOKENS_PER_CHUNK_PROMPT, TARGET_REJOINED_S2_1_TOKENS, dry_run)
-    results["identified_themes_stage2_2"] = process_and_rejoin_stage("2.2", all_individual_summaries, model, processor, ALL_PROMPT_TEMPLATES, MAX_SAFE_TOKENS_PER_CHUNK_PROMPT, TARGET_REJOINED_S2_2_TOKENS, dry_run)
-    results["narrative_plan_stage2_3"] = process_and_rejoin_stage("2.3", all_individual_summaries, model, processor, ALL_PROMPT_TEMPLATES, MAX_SAFE_TOKENS_PER_CHUNK_PROMPT, TARGET_REJOINED_S2_3_TOKENS, dry_run)
+    # Optionally answer all three Stage 2 sub-tasks in one generation; whatever it does not
+    # produce is generated separately, prefilling the shared summaries once when that helps.
+    stage2_results = {}
+    if STAGE2_COMBINED_GENERATION and not dry_run:
+        stage2_results = process_stage2_combined(all_individual_summaries, model, processor, ALL_PROMPT_TEMPLATES,
+                                                 MAX_SAFE_TOKENS_PER_CHUNK_PROMPT) or {}
+    remaining_subtasks = [subtask for subtask in STAGE2_SUBTASKS if subtask[2] not in stage2_results]
+    stage2_prompt_cache = None
+    if len(remaining_subtasks) > 1 and not dry_run:
+        full_content_text = "\n\n---\n\n".join(all_individual_summaries)
+        single_pass_prompts = [build_stage2_single_pass_prompt(ALL_PROMPT_TEMPLATES[f"STAGE{stage_id.replace('.', '_')}"], full_content_text)
+                               for stage_id, _, _, _ in remaining_subtasks]
+        if all(get_token_count(SYSTEM_PROMPT + prompt, processor) <= MAX_SAFE_TOKENS_PER_CHUNK_PROMPT for prompt in single_pass_prompts):
+            try:
+                stage2_prompt_cache = build_shared_prefix_cache(model, processor, single_pass_prompts)
+            except Exception as e:
+                logger.warning(f"Could not prefill shared Stage 2 prefix, continuing without it: {e}")
+
+    for stage_id, _, result_key, target_tokens in remaining_subtasks:
+        stage2_results[result_key] = process_and_rejoin_stage(stage_id, all_individual_summaries, model, processor, ALL_PROMPT_TEMPLATES,
+                                                              MAX_SAFE_TOKENS_PER_CHUNK_PROMPT, target_tokens, dry_run, stage2_prompt_cache)
+    results.update((result_key, stage2_results[result_key]) for _, _, result_key, _ in STAGE2_SUBTASKS)
 
     logger.info("--- Starting Stage 3: Generating Final Narrative Exposition ---")
     if not dry_run:
@@ -525,7 +933,8 @@ def run_narrative_summarization_workflow(consultation_id, article_db_id_to_proce
             narrative_plan=results["narrative_plan_stage2_3"]
         )
         core_input = f"Summary:\n{results['cohesive_summary_stage2_1']}\n\nThemes:\n{results['identified_themes_stage2_2']}\n\nPlan:\n{results['narrative_plan_stage2_3']}"
-        results["final_narrative_stage3"] = summarize_text(model, processor, "3.0_final_narrative", stage3_prompt, core_input, ALL_PROMPT_TEMPLATES["STAGE3_INTRO"], 4096)
+        results["final_narrative_stage3"] = summarize_text(model, processor, "3.0_final_narrative", stage3_prompt, core_input, ALL_PROMPT_TEMPLATES["STAGE3_INTRO"], 4096,
+                                                           draft=load_draft_model(STAGE3_DRAFT_MODEL_ID))
     else:
         results["final_narrative_stage3"] = "[DRY RUN] Placeholder for final Stage 3 narrative."
     results['stages_completed'].append("Stage 3: Final Narrative Exposition")
@@ -533,40 +942,151 @@ def run_narrative_summarization_workflow(consultation_id, article_db_id_to_proce
     logger.info(f"Workflow completed for consultation_id: {consultation_id}")
     return results
 
-def main():
-    global DB_PATH
+def write_results_json(results: Dict[str, Any], f, pretty: bool = False) -> None:
+    """Streams the results dict to a binary file as a JSON object.
+
+    Each top-level entry is encoded and written separately, so only one value's encoded
+    form is held in memory at a time instead of the whole payload. Output is compact
+    unless pretty is set, which indents it by two spaces.
+    """
+    entry_separator, key_separator = (b",\n  ", b": ") if pretty else (b",", b":")
+    f.write(b"{\n  " if pretty and results else b"{")
+    for i, (key, value) in enumerate(results.items()):
+        if orjson is not None:
+            encoded_key = orjson.dumps(str(key))
+            encoded_value = orjson.dumps(value, option=(orjson.OPT_INDENT_2 if pretty else 0) | orjson.OPT_NON_STR_KEYS)
+        else:
+            encoded_key = json.dumps(str(key), ensure_ascii=False).encode('utf-8')
+            encoded_value = json.dumps(value, ensure_ascii=False, indent=2 if pretty else None,
+                                       separators=None if pretty else (',', ':')).encode('utf-8')
+        if pretty:
+            # Raw newlines only occur between JSON tokens, so this nests the value one level deeper.
+            encoded_value = encoded_value.replace(b"\n", b"\n  ")
+        f.write((entry_separator if i else b"") + encoded_key + key_separator + encoded_value)
+    f.write(b"\n}\n" if pretty and results else b"}\n")
+
+RESULTS_FILE_EXTENSIONS = {"json": ".json", "msgpack": ".msgpack", "pickle": ".pkl"}
+
+def write_results(results: Dict[str, Any], f, output_format: str = "json", pretty: bool = False) -> None:
+    """Writes the results dict to a binary file in the requested format.
+
+    msgpack and pickle are for downstream Python consumers: smaller and faster to load than JSON.
+    """
+    if output_format == "msgpack":
+        f.write(msgpack.packb(results, use_bin_type=True))
+    elif output_format == "pickle":
+        pickle.dump(results, f, protocol=5)
+    else:
+        write_results_json(results, f, pretty=pretty)
+
+console_log_listener = None
+
+def enable_debug_console_logging():
+    """Attaches one queued console handler to both loggers.
+
+    Idempotent, so calling main() repeatedly with --debug does not duplicate console records.
+    """
+    global console_log_listener
+    if console_log_listener is not None: return
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    console_handler.setFormatter(formatter)
+    # Console output goes through its own queue and listener thread, like the file logs.
+    console_queue = queue.Queue(-1)
+    console_queue_handler = logging.handlers.QueueHandler(console_queue)
+    logger.addHandler(console_queue_handler)
+    reasoning_trace_logger.addHandler(console_queue_handler)
+    console_log_listener = logging.handlers.QueueListener(console_queue, console_handler, respect_handler_level=True)
+    console_log_listener.start()
+    atexit.register(console_log_listener.stop)
+
+@functools.lru_cache(maxsize=None)
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Builds the CLI parser on first use and reuses it for repeated main() calls."""
     cli = argparse.ArgumentParser(description="Orchestrate Narrative Summarization Workflow.")
     cli.add_argument("--consultation_id", type=int, required=True, help="ID of the consultation to process.")
     cli.add_argument("--article_db_id", type=int, help="Optional: Specific DB article ID to process.")
     cli.add_argument("--dry_run", action='store_true', help="Dry run without calling the LLM.")
     cli.add_argument("--debug", action='store_true', help="Enable debug logging to console.")
+    cli.add_argument("--pretty", action='store_true', help="Indent the results JSON for reading; compact by default.")
+    cli.add_argument("--format", choices=sorted(RESULTS_FILE_EXTENSIONS), default="json",
+                     help="Results file format; msgpack and pickle are for Python consumers. Default: json")
+    cli.add_argument("--gzip", action='store_true', help="Gzip-compress the results file (fast level 1).")
     cli.add_argument("--db-path", type=str, default=DB_PATH, help=f"Path to SQLite DB. Default: {DB_PATH}")
-    args = cli.parse_args()
+    cli.add_argument("--stage2-combined", action='store_true', default=STAGE2_COMBINED_GENERATION,
+                     help="Try answering Stages 2.1-2.3 in one generation when the summaries fit a single prompt.")
+    cli.add_argument("--stage3-draft-model", type=str, default=STAGE3_DRAFT_MODEL_ID,
+                     help="Optional draft model ID for speculative decoding in Stage 3. Default: off")
+    return cli
+
+@functools.lru_cache(maxsize=4)
+def parse_cli_args(argv: Tuple[str, ...]) -> argparse.Namespace:
+    """Parses argv once per distinct argument tuple; callers must not mutate the result."""
+    return build_arg_parser().parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    global DB_PATH, STAGE2_COMBINED_GENERATION, STAGE3_DRAFT_MODEL_ID
+    args = parse_cli_args(tuple(sys.argv[1:] if argv is None else argv))
+    setup_file_logging()
     DB_PATH = args.db_path
+    STAGE2_COMBINED_GENERATION = args.stage2_combined
+    STAGE3_DRAFT_MODEL_ID = args.stage3_draft_model
     
     if args.debug:
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(formatter)
-        if not logger.handlers: logger.addHandler(console_handler)
-        if not reasoning_trace_logger.handlers: reasoning_trace_logger.addHandler(console_handler)
+        enable_debug_console_logging()
         logger.info("DEBUG mode enabled.")
 
-    logger.info(f"Script started with args: {args}")
-    start_time = datetime.datetime.now()
+    # Open and tune the shared connection up front; the workflow's fetches reuse it.
+    # sqlite3 would silently create a missing file, so check for it first.
+    if not os.path.exists(DB_PATH):
+        logger.error("Database file not found at %s; aborting before running the workflow.", DB_PATH)
+        return
+    try:
+        get_db_connection()
+    except sqlite3.Error as e:
+        logger.error("Could not open database %s: %s", DB_PATH, e, exc_info=True)
+        return
+
+    # Resolve the output path before the long workflow run, and fail fast if it cannot be written.
+    if args.format == "msgpack" and msgpack is None:
+        logger.error("--format msgpack requires the msgpack package; aborting before running the workflow.")
+        return
+    output_filename = f"narrative_results_{args.consultation_id}_{TIMESTAMP}{RESULTS_FILE_EXTENSIONS[args.format]}"
+    if args.gzip: output_filename += ".gz"
+    output_path = os.path.join(OUTPUT_DIR, output_filename)
+    # Write to a temporary file and swap it in, so a crash mid-write never leaves a truncated JSON.
+    tmp_output_path = output_path + '.tmp'
+    if not os.access(OUTPUT_DIR, os.W_OK):
+        logger.error("Output directory %s is not writable; aborting before running the workflow.", OUTPUT_DIR)
+        return
+
+    start_time = time.perf_counter()
     results = run_narrative_summarization_workflow(args.consultation_id, args.article_db_id, args.dry_run)
-    elapsed = (datetime.datetime.now() - start_time).total_seconds()
-    logger.info(f"Script finished in {elapsed:.2f} seconds.")
+    elapsed = time.perf_counter() - start_time
+    # One summary record per run; the workflow itself logs its start with the consultation id.
+    logger.info("Run complete in %.2f seconds with args: %s", elapsed, args,
+                extra={'elapsed_s': elapsed, 'consultation_id': args.consultation_id, 'dry_run': args.dry_run})
+
+    if args.dry_run:
+        logger.info("Dry-run: skipping results write (result has %d top-level keys)", len(results))
+        return
 
-    output_filename = f"narrative_results_{args.consultation_id}_{TIMESTAMP}.json"
-    output_path = os.path.join(SCRIPT_DIR, output_filename)
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=4)
-        logger.info(f"Full results saved to {output_path}")
+        # A 1 MiB buffer coalesces the per-entry writes into a few large write() calls.
+        with open(tmp_output_path, 'wb', buffering=RESULTS_WRITE_BUFFER_SIZE) as raw_file:
+            if args.gzip:
+                # Level 1 compresses the repetitive narrative text well at near-copy speed.
+                with gzip.GzipFile(filename=output_filename[:-len(".gz")], mode='wb', compresslevel=1, fileobj=raw_file) as f:
+                    write_results(results, f, args.format, pretty=args.pretty)
+            else:
+                write_results(results, raw_file, args.format, pretty=args.pretty)
+        os.replace(tmp_output_path, output_path)
+        logger.info("Full results saved to %s", output_path)
     except Exception as e:
-        logger.error(f"Failed to save results to JSON: {e}")
+        logger.error("Failed to save results: %s", e)
+        if os.path.exists(tmp_output_path):
+            os.remove(tmp_output_path)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
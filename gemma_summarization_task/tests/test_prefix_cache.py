@@ -0,0 +1,99 @@
+"""Shared Stage 2 prefix cache must not change what the model generates."""
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "orchestrate_summarization_v4.py"
+VOCAB_SIZE = 96
+MAX_NEW_TOKENS = 8
+
+
+class CharTokenizer:
+    """One token per character, enough to drive tokenize_chat_prompt without a download."""
+
+    def __call__(self, text, add_special_tokens=False, return_tensors=None):
+        ids = [ord(ch) % VOCAB_SIZE for ch in text]
+        if return_tensors == "pt":
+            return transformers.BatchEncoding(
+                {"input_ids": torch.tensor([ids]), "attention_mask": torch.ones((1, len(ids)), dtype=torch.long)}
+            )
+        return transformers.BatchEncoding({"input_ids": ids})
+
+
+class CharProcessor:
+    """Minimal stand-in for the Gemma processor with a Gemma-like chat template."""
+
+    def __init__(self):
+        self.tokenizer = CharTokenizer()
+
+    def apply_chat_template(self, messages, add_generation_prompt=True, tokenize=False):
+        turns = "".join(part["text"] for message in messages for part in message["content"])
+        return f"<start_of_turn>user\n{turns}<end_of_turn>\n<start_of_turn>model\n"
+
+    def decode(self, ids, skip_special_tokens=True):
+        return "".join(chr(32 + int(i)) for i in ids)
+
+
+@pytest.fixture(scope="module")
+def v4():
+    spec = importlib.util.spec_from_file_location("orchestrate_summarization_v4", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # import_workflow_dependencies() also needs article_parser_utils, which these checks do not use.
+    module.torch = torch
+    module.BatchEncoding = transformers.BatchEncoding
+    module.DynamicCache = transformers.DynamicCache
+    return module
+
+
+@pytest.fixture(scope="module")
+def tiny_model():
+    torch.manual_seed(0)
+    config = transformers.Gemma3TextConfig(
+        vocab_size=VOCAB_SIZE, hidden_size=32, intermediate_size=64, num_hidden_layers=2,
+        num_attention_heads=2, num_key_value_heads=1, head_dim=16, max_position_embeddings=2048,
+        sliding_window=16,
+    )
+    return transformers.AutoModelForCausalLM.from_config(config, attn_implementation="eager").eval()
+
+
+@pytest.fixture
+def stage2_prompts(v4):
+    summaries = "\n\n---\n\n".join(["First article summary.", "Second article summary.", "Third one."])
+    return [v4.build_stage2_single_pass_prompt(task, summaries) for task in ("Summarize.", "List the themes.")]
+
+
+def test_prefix_cache_generation_matches_uncached(v4, tiny_model, stage2_prompts):
+    processor = CharProcessor()
+    prompt_cache = v4.build_shared_prefix_cache(tiny_model, processor, stage2_prompts)
+    assert prompt_cache is not None
+    cached_kv, prefix_len = prompt_cache
+
+    for prompt in stage2_prompts:
+        inputs = v4.tokenize_chat_prompt(processor, prompt)
+        with torch.inference_mode():
+            expected = tiny_model.generate(**inputs, max_new_tokens=MAX_NEW_TOKENS, do_sample=False)
+            actual = tiny_model.generate(**inputs, max_new_tokens=MAX_NEW_TOKENS, do_sample=False,
+                                         past_key_values=cached_kv)
+        v4.reset_prefix_cache(prompt_cache)
+        assert torch.equal(actual, expected)
+        assert cached_kv.get_seq_length() == prefix_len
+
+
+def test_summarize_text_with_prefix_cache_matches_uncached(v4, tiny_model, stage2_prompts):
+    processor = CharProcessor()
+    prompt_cache = v4.build_shared_prefix_cache(tiny_model, processor, stage2_prompts)
+    assert prompt_cache is not None
+
+    for prompt in stage2_prompts:
+        uncached = v4.summarize_text(tiny_model, processor, "2.x", prompt, "input", "task", MAX_NEW_TOKENS)
+        cached = v4.summarize_text(tiny_model, processor, "2.x", prompt, "input", "task", MAX_NEW_TOKENS,
+                                   prompt_cache=prompt_cache)
+        assert not cached.startswith("[ERROR")
+        assert cached == uncached
@@ -1,5 +1,7 @@
 import sqlite3
 import os
+from itertools import chain, groupby
+from operator import itemgetter
 
 # --- Configuration ---
 # Number of consultations to export
@@ -8,6 +10,8 @@ NUM_CONSULTATIONS_TO_EXPORT = 80
 DB_PATH = '/mnt/data/Myrsini/ai4deliberation/deliberation_data_BACKUP.db'
 # Output text file name
 OUTPUT_FILE_NAME = 'exported_consultations_data.txt'
+# Write buffer for the output file, so the export is flushed in large chunks
+OUTPUT_WRITE_BUFFER_SIZE = 1 << 20
 # ---------------------
 
 def export_consultations_to_text(db_path, output_file, num_consultations):
@@ -20,67 +24,72 @@ def export_consultations_to_text(db_path, output_file, num_consultations):
         return
 
     conn = None
-    output_lines = []
 
     try:
         conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
-        # Fetch consultations
+        # Cheap count for the report header, so the rows below can be written as they stream in
+        cursor.execute("SELECT COUNT(*) FROM (SELECT id FROM consultations LIMIT ?)", (num_consultations,))
+        consultation_count = cursor.fetchone()[0]
+        if not consultation_count:
+            print(f"No consultations found in the database {db_path}.")
+            return
+
+        # Fetch consultations together with their related articles in one query,
+        # instead of one articles query per consultation.
         # Querying specific columns as identified: id, title, start_minister_message, end_minister_message
+        # and, per article: id, title, content (article id is NULL when a consultation has none)
         cursor.execute("""
-            SELECT id, title, start_minister_message, end_minister_message 
-            FROM consultations 
-            ORDER BY id ASC 
-            LIMIT ?
+            SELECT c.id AS consultation_id, c.title AS consultation_title,
+                   c.start_minister_message, c.end_minister_message,
+                   a.id AS article_id, a.title AS article_title, a.content AS article_content
+            FROM (
+                SELECT id, title, start_minister_message, end_minister_message 
+                FROM consultations 
+                ORDER BY id ASC 
+                LIMIT ?
+            ) AS c
+            LEFT JOIN articles a ON a.consultation_id = c.id
+            ORDER BY c.id ASC, a.id ASC
         """, (num_consultations,))
-        consultations = cursor.fetchall()
-
-        if not consultations:
-            print(f"No consultations found in the database {db_path}.")
-            return
 
-        output_lines.append(f"Exporting data for {len(consultations)} consultations:\n")
-        output_lines.append("=" * 50 + "\n")
+        # Write each consultation as soon as its rows are read from the cursor, so only one
+        # row is held in memory at a time instead of the whole export
+        with open(output_file, 'w', encoding='utf-8', buffering=OUTPUT_WRITE_BUFFER_SIZE) as f:
+            print(f"Exporting data for {consultation_count} consultations:\n", file=f)
+            print("=" * 50 + "\n", file=f)
 
-        for i, consultation in enumerate(consultations):
-            consultation_id, cons_title, start_message, end_message = consultation
+            for i, (_, rows) in enumerate(groupby(cursor, key=itemgetter('consultation_id'))):
+                consultation = next(rows)
+                consultation_id = consultation['consultation_id']
+                cons_title = consultation['consultation_title']
+                start_message = consultation['start_minister_message']
+                end_message = consultation['end_minister_message']
             
-            output_lines.append(f"--- Consultation {i+1} ---")
-            output_lines.append(f"Consultation ID: {consultation_id}")
-            output_lines.append(f"Consultation Title: {cons_title if cons_title else 'N/A'}")
-            output_lines.append("Start Minister Message:")
-            output_lines.append(f"{start_message if start_message else 'N/A'}")
-            output_lines.append("End Minister Message:")
-            output_lines.append(f"{end_message if end_message else 'N/A'}\n")
+                print(f"--- Consultation {i+1} ---", file=f)
+                print(f"Consultation ID: {consultation_id}", file=f)
+                print(f"Consultation Title: {cons_title if cons_title else 'N/A'}", file=f)
+                print("Start Minister Message:", file=f)
+                print(f"{start_message if start_message else 'N/A'}", file=f)
+                print("End Minister Message:", file=f)
+                print(f"{end_message if end_message else 'N/A'}\n", file=f)
             
-            # Fetch related articles for the current consultation
-            # Querying specific columns: title, content
-            cursor.execute("""
-                SELECT title, content 
-                FROM articles 
-                WHERE consultation_id = ? 
-                ORDER BY id ASC
-            """, (consultation_id,))
-            articles = cursor.fetchall()
-
-            if articles:
-                output_lines.append("  Related Articles:")
-                for j, article in enumerate(articles):
-                    article_title, article_content = article
-                    output_lines.append(f"    Article {j+1}:")
-                    output_lines.append(f"      Article Title: {article_title if article_title else 'N/A'}")
-                    output_lines.append( "      Article Content:")
-                    output_lines.append(f"      {article_content if article_content else 'N/A'}\n")
-            else:
-                output_lines.append("  No related articles found for this consultation.\n")
+                # The LEFT JOIN yields a single row with a NULL article id for a consultation without articles
+                if consultation['article_id'] is not None:
+                    print("  Related Articles:", file=f)
+                    for j, article in enumerate(chain((consultation,), rows)):
+                        article_title = article['article_title']
+                        article_content = article['article_content']
+                        print(f"    Article {j+1}:", file=f)
+                        print(f"      Article Title: {article_title if article_title else 'N/A'}", file=f)
+                        print("      Article Content:", file=f)
+                        print(f"      {article_content if article_content else 'N/A'}\n", file=f)
+                else:
+                    print("  No related articles found for this consultation.\n", file=f)
             
-            output_lines.append("=" * 50 + "\n")
-
-        # Write to output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for line in output_lines:
-                f.write(line + "\n")
+                print("=" * 50 + "\n", file=f)
         print(f"Successfully exported data to {output_file}")
 
     except sqlite3.Error as e:
@@ -1,6 +1,6 @@
 import re
 import sqlite3
-from collections import Counter
+from collections import Counter, namedtuple
 
 # Simplified regex pattern to detect only ν., Ν., or νόμου followed by number/year
 SIMPLIFIED_LAW_REGEX = r"""
@@ -11,25 +11,25 @@ SIMPLIFIED_LAW_REGEX = r"""
 \s*/\s*
 (?P<year>\d{4})               # Year (required)
 """
+# Compiled once at import; find_law_references_in_text runs for every article
+SIMPLIFIED_LAW_PATTERN = re.compile(SIMPLIFIED_LAW_REGEX, re.IGNORECASE | re.VERBOSE)
+
+LawReference = namedtuple(
+    'LawReference', 'full_match type number year start_pos end_pos'
+)
 
 def find_law_references_in_text(text):
     """Find law references in a given text using the simplified regex"""
     if not text:
         return []
     
-    pattern = re.compile(SIMPLIFIED_LAW_REGEX, re.IGNORECASE | re.VERBOSE)
     matches = []
     
-    for match in pattern.finditer(text):
-        match_details = match.groupdict()
-        matches.append({
-            'full_match': match.group(0),
-            'type': match_details.get('type'),
-            'number': match_details.get('number'),
-            'year': int(match_details.get('year')),
-            'start_pos': match.start(),
-            'end_pos': match.end()
-        })
+    for match in SIMPLIFIED_LAW_PATTERN.finditer(text):
+        law_type, number, year = match.group('type', 'number', 'year')
+        matches.append(LawReference(
+            match.group(0), law_type, number, int(year), match.start(), match.end()
+        ))
     
     return matches
 
@@ -61,27 +61,31 @@ def summarize_law_detection():
     
     print(f"Analyzing {len(consultations)} consultation articles...")
     
-    all_law_references = []
     articles_with_refs = 0
-    unique_laws = set()
+    # Filled in the same pass as the article scan; its keys are the unique laws
+    law_counter = Counter()
+    # Articles are often repeated verbatim across consultations; scan each distinct text once.
+    # LawReference tuples are immutable, so the cached lists can be shared safely.
+    law_refs_by_content = {}
     
     for cons_id, cons_title, art_id, art_title, art_content in consultations:
-        law_refs = find_law_references_in_text(art_content)
+        law_refs = law_refs_by_content.get(art_content)
+        if law_refs is None:
+            law_refs = law_refs_by_content[art_content] = find_law_references_in_text(art_content)
         
         if law_refs:
             articles_with_refs += 1
-            for ref in law_refs:
-                all_law_references.append(ref)
-                unique_laws.add((ref['number'], ref['year']))
+            law_counter.update((ref.number, ref.year) for ref in law_refs)
+    
+    unique_laws = list(law_counter)
     
     print(f"\nSUMMARY:")
     print(f"- Articles analyzed: {len(consultations)}")
     print(f"- Articles with law references: {articles_with_refs}")
-    print(f"- Total law references found: {len(all_law_references)}")
+    print(f"- Total law references found: {sum(law_counter.values())}")
     print(f"- Unique laws referenced: {len(unique_laws)}")
     
-    # Count most frequently referenced laws
-    law_counter = Counter((ref['number'], ref['year']) for ref in all_law_references)
+    # Most frequently referenced laws
     print(f"\nMOST FREQUENTLY REFERENCED LAWS:")
     for (number, year), count in law_counter.most_common(10):
         print(f"  - Law {number}/{year}: {count} references")
@@ -114,7 +118,8 @@ def summarize_law_detection():
             print()
     
     # Show some unmatched laws (laws referenced but not in our table)
-    unmatched_laws = [law for law in unique_laws if not any(law[0] == m[0] and law[1] == m[1] for m in matched_laws)]
+    matched_keys = {(number, year) for number, year, _ in matched_laws}
+    unmatched_laws = [law for law in unique_laws if law not in matched_keys]
     if unmatched_laws:
         print(f"SAMPLE UNMATCHED LAWS (not in Greek_laws table):")
         for number, year in unmatched_laws[:10]:
@@ -145,7 +150,7 @@ def test_regex_only():
         if matches:
             print(f"  ✓ Found {len(matches)} matches:")
             for match in matches:
-                print(f"    → {match['full_match']} (Law {match['number']}/{match['year']})")
+                print(f"    → {match.full_match} (Law {match.number}/{match.year})")
         else:
             print("  ✗ No matches found")
         print()
@@ -11,16 +11,17 @@ SIMPLIFIED_LAW_REGEX = r"""
 \s*/\s*
 (?P<year>\d{4})               # Year (required)
 """
+# Compiled once at import; find_law_references_in_text runs for every article
+SIMPLIFIED_LAW_PATTERN = re.compile(SIMPLIFIED_LAW_REGEX, re.IGNORECASE | re.VERBOSE)
 
 def find_law_references_in_text(text):
     """Find law references in a given text using the simplified regex"""
     if not text:
         return []
     
-    pattern = re.compile(SIMPLIFIED_LAW_REGEX, re.IGNORECASE | re.VERBOSE)
     matches = []
     
-    for match in pattern.finditer(text):
+    for match in SIMPLIFIED_LAW_PATTERN.finditer(text):
         match_details = match.groupdict()
         matches.append({
             'full_match': match.group(0),
@@ -4,6 +4,7 @@ Focuses on splitting a DB article into true article chunks, with gap-filling.
 from __future__ import annotations
 
 import re
+from itertools import chain
 from typing import List, Dict, Any
 
 # Import original helpers if available
@@ -17,6 +18,10 @@ __all__ = [
 ]
 
 
+# "Άρθρο" with or without tonos, or "article". Both patterns are case-insensitive, so
+# this covers Άρθρο/ΆΡΘΡΟ/άρθρο and ΑΡΘΡΟ with a single branch instead of four.
+_ARTICLE_WORD = r"(?:[άα]ρθρο|article)"
+
 # Matches lines like:
 #   Άρθρο 1
 #   ### Άρθρο 2
@@ -25,30 +30,36 @@ __all__ = [
 # Optional leading markdown heading symbols (e.g. ###) or bold markers (one to three '*').
 # Match article headers at line start (for content)
 _ARTICLE_REGEX = re.compile(
-    r"^\s*(?:#+\s*)?(?:\*{1,3}\s*)?(?:Άρθρο|ΑΡΘΡΟ|ΆΡΘΡΟ|άρθρο|article)\s+(\d+)",
+    rf"^\s*(?:#+\s*)?(?:\*{{1,3}}\s*)?{_ARTICLE_WORD}\s+(\d+)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Quote characters or an _ARTICLE_REGEX header, so _extract_header_numbers can track
+# quote state and find headers in one scan of the text.
+_HEADER_OR_QUOTE_REGEX = re.compile(
+    rf"(?P<quote>[\"'])|^\s*(?:#+\s*)?(?:\*{{1,3}}\s*)?{_ARTICLE_WORD}\s+(?P<num>\d+)",
     re.IGNORECASE | re.MULTILINE,
 )
 
 # Separate lightweight pattern for grabbing number anywhere inside a single line (DB title)
-_INLINE_ARTICLE_RE = re.compile(r"(?:Άρθρο|ΑΡΘΡΟ|ΆΡΘΡΟ|άρθρο|article)\s+(\d+)", re.IGNORECASE)
+_INLINE_ARTICLE_RE = re.compile(rf"{_ARTICLE_WORD}\s+(\d+)", re.IGNORECASE)
 
 
 def _extract_header_numbers(text: str) -> List[int]:
     """Detect main headers (outside quotes) and return sorted article numbers."""
     numbers: List[int] = []
-    for match in _ARTICLE_REGEX.finditer(text):
-        if _inside_quotes(text, match.start()):
-            continue
-        num = int(match.group(1))
-        numbers.append(num)
+    # Naive quote check in the same single pass as the header scan: bit 0 tracks an
+    # odd number of '"' so far, bit 1 an odd number of "'"; non-zero means inside quotes.
+    quote_state = 0
+    for match in _HEADER_OR_QUOTE_REGEX.finditer(text):
+        quote = match.group("quote")
+        if quote:
+            quote_state ^= 1 if quote == "\"" else 2
+        elif not quote_state:
+            numbers.append(int(match.group("num")))
     return sorted(set(numbers))
 
 
-def _inside_quotes(text: str, idx: int) -> bool:
-    """Naive quote check: count quotes before idx, odd => inside quotes."""
-    return text[:idx].count("\"") % 2 == 1 or text[:idx].count("'") % 2 == 1
-
-
 # -------------------------------------------------------------
 # Public API
 # -------------------------------------------------------------
@@ -60,8 +71,11 @@ def get_article_chunks(db_content: str, db_title: str) -> List[Dict[str, Any]]:
     if not db_content.strip():
         return []
 
-    header_iter = list(_ARTICLE_REGEX.finditer(db_content))
-    if not header_iter:
+    # Headers are consumed lazily with a one-step lookahead (each chunk ends where the
+    # next header starts) rather than materialising every match up front.
+    header_iter = _ARTICLE_REGEX.finditer(db_content)
+    match = next(header_iter, None)
+    if match is None:
         # Try extract number from DB title line
         m = _INLINE_ARTICLE_RE.search(db_title)
         art_num = int(m.group(1)) if m else None
@@ -73,9 +87,9 @@ def get_article_chunks(db_content: str, db_title: str) -> List[Dict[str, Any]]:
         }]
 
     chunks: List[Dict[str, Any]] = []
-    for i, match in enumerate(header_iter):
+    for next_match in chain(header_iter, (None,)):
         start = match.end()
-        end = header_iter[i + 1].start() if i + 1 < len(header_iter) else len(db_content)
+        end = next_match.start() if next_match is not None else len(db_content)
         content_slice = db_content[start:end].strip()
         title_line = match.group(0).strip()
         chunks.append({
@@ -84,4 +98,5 @@ def get_article_chunks(db_content: str, db_title: str) -> List[Dict[str, Any]]:
             "article_number": int(match.group(1)),
             "source_db_title": db_title,
         })
+        match = next_match
     return chunks
@@ -1,7 +1,7 @@
 """Token/word budget helpers."""
 from __future__ import annotations
 
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 from .config import TARGET_COMPRESSION_RATIO, MAX_CONTEXT_TOKENS
 import math
 
@@ -50,6 +50,7 @@ def summarization_budget(
     avg_words_per_sentence: int = AVG_WORDS_PER_SENTENCE,
     tokens_per_word: float = TOKENS_PER_WORD_GEN,
     overshoot: float = OVERSHOOT_RATIO,
+    word_count: Optional[int] = None,
 ) -> Dict[str, int]:
     """Return budgeting dict for summarisation.
 
@@ -65,12 +66,15 @@ def summarization_budget(
         Estimated model-generated tokens per word (default 2.5).
     overshoot : float, optional
         Extra safety margin multiplier for token_limit (default +10 %).
+    word_count : int, optional
+        Word count of *text* when the caller already has it (e.g. from
+        :func:`length_metrics`); *text* is only split when this is omitted.
 
     Returns
     -------
     dict with keys ``target_words``, ``target_sentences``, ``token_limit``.
     """
-    words = len(text.split())
+    words = len(text.split()) if word_count is None else word_count
     target_words = max(1, math.floor(words * compression_ratio))
     target_sentences = max(1, round(target_words / avg_words_per_sentence))
     token_limit = int(math.ceil(target_words * tokens_per_word * overshoot))
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import sqlite3
 import logging
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 from .config import DB_PATH, TABLE_NAME, TITLE_COLUMN, CONTENT_COLUMN
@@ -15,6 +16,16 @@ __all__ = ["ArticleRow", "fetch_articles"]
 
 ArticleRow = Dict[str, Any]
 
+# Bytes of the DB file SQLite may memory-map for reads (instead of copying pages through its cache)
+_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def _connect_read_only(path: str) -> sqlite3.Connection:
+    """Open *path* read-only (no write locks or journal) with memory-mapped reads."""
+    conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    conn.execute(f"PRAGMA mmap_size = {_MMAP_SIZE}")
+    return conn
+
 
 def fetch_articles(
     consultation_id: int,
@@ -33,7 +44,7 @@ def fetch_articles(
     """
     path = db_path or DB_PATH
     logger.info("Fetching articles from SQLite: %s", path)
-    conn = sqlite3.connect(path)
+    conn = _connect_read_only(path)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
 
@@ -11,6 +11,7 @@ from __future__ import annotations
 
 import re
 import json
+from itertools import islice
 from typing import List, Dict, Any, Tuple, Match, Optional
 
 __all__ = [
@@ -172,6 +173,11 @@ def article_modifies_law(text: str) -> bool:
     # Accept either (a) multiline quote or (b) a *full-line* single quote (starts with «, ends with » or ». )
     start_idx = candidate_match.end()
 
+    # Both checks below need an opening «; one C-level find rules most articles out
+    # before the regex search and the line-by-line scan.
+    if text.find("«", start_idx) == -1:
+        return False
+
     if _MULTILINE_QUOTE_RE.search(text, pos=start_idx):
         return True
 
@@ -378,8 +384,8 @@ def detect_scope_and_objective(article1_text: str, article2_text: str) -> dict[s
 
 
 def _first_two_nonempty_lines(text: str) -> str:
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    return "\n".join(lines[:2])
+    # Each line is stripped once, and stripping stops after the second non-empty one.
+    return "\n".join(islice(filter(None, map(str.strip, text.splitlines())), 2))
 
 
 def is_skopos_article(chunk: dict | str) -> bool:  # noqa: D401
@@ -278,7 +278,7 @@ def plan_narrative(
             validator_args=(allowed_keys,),
             max_retries=2,
         )
-        _log.debug(f"Narrative plan generated after {retries} retries")
+        _log.debug("Narrative plan generated after %s retries", retries)
     except Exception as e:
         _log.error(f"Failed to generate validated narrative plan: {e}")
         raise
@@ -294,15 +294,15 @@ def plan_narrative(
     # Parse the response (expected to be JSON format)
     try:
         # Log the raw response for debugging
-        _log.debug(f"Raw LLM response (first 100 chars): {response[:100]}...")
+        _log.debug("Raw LLM response (first 100 chars): %s...", response[:100])
         
         # Extract JSON if wrapped in markdown or other text
         try:
             json_str = extract_json_from_text(response)
-            _log.debug(f"Extracted JSON string (first 100 chars): {json_str[:100]}...")
+            _log.debug("Extracted JSON string (first 100 chars): %s...", json_str[:100])
         except ValueError as e:
             _log.error(f"Failed to extract JSON from LLM response: {e}")
-            _log.debug(f"Raw response: {response}")
+            _log.debug("Raw response: %s", response)
             raise ValueError(f"Could not extract JSON from LLM output") from e
         
         # Parse the JSON string
@@ -310,7 +310,7 @@ def plan_narrative(
             narrative_plan = json.loads(json_str)
         except json.JSONDecodeError as e:
             _log.error(f"JSON parsing error: {e}")
-            _log.debug(f"Problematic JSON string: {json_str}")
+            _log.debug("Problematic JSON string: %s", json_str)
             
             # Try additional fixes for common issues
             if '\\"' in json_str or '\\n' in json_str:
@@ -333,7 +333,7 @@ def plan_narrative(
         missing_keys = [key for key in required_keys if key not in narrative_plan]
         if missing_keys:
             _log.error(f"Missing required keys in narrative plan: {missing_keys}")
-            _log.debug(f"Available keys: {list(narrative_plan.keys())}")
+            _log.debug("Available keys: %s", list(narrative_plan.keys()))
             raise ValueError(f"Invalid narrative plan format: missing keys {missing_keys}")
         
         # Validate the structure of narrative_sections
@@ -354,7 +354,7 @@ def plan_narrative(
         story_beats = narrative_plan.get("narrative_sections", [])
         if not story_beats or not isinstance(story_beats, list):
             _log.error("No story beats found in narrative plan or invalid format")
-            _log.debug(f"Story beats: {story_beats}")
+            _log.debug("Story beats: %s", story_beats)
             raise ValueError("Narrative plan must contain at least one story beat")
             
         _log.info(f"Successfully parsed narrative plan with {len(story_beats)} story beats")
@@ -531,7 +531,7 @@ def generate_part_summary(
         # Note: summarization_budget expects text input, not word count
         budget_info = summarization_budget(total_input_text, compression_ratio=0.6)
         max_tokens_total = budget_info['token_limit']
-        _log.debug(f"Calculated total budget: {max_tokens_total} tokens from {len(total_input_text)} chars input")
+        _log.debug("Calculated total budget: %d tokens from %d chars input", max_tokens_total, len(total_input_text))
     
     # Budget allocation: 30% for planning, 70% for synthesis, with minimums
     planning_budget = max(int(max_tokens_total * 0.3), 800)  # Minimum 800 tokens for planning
@@ -629,7 +629,7 @@ def extract_json_from_text(text: str) -> str:
     ValueError
         If no JSON-like content could be found
     """
-    _log.debug(f"Attempting to extract JSON from text of length {len(text)}")
+    _log.debug("Attempting to extract JSON from text of length %d", len(text))
     text = text.strip()
     
     # Case 1: Already valid JSON
@@ -638,7 +638,7 @@ def extract_json_from_text(text: str) -> str:
         _log.debug("Text was already valid JSON")
         return text
     except json.JSONDecodeError as e:
-        _log.debug(f"Text is not valid JSON as-is: {e}")
+        _log.debug("Text is not valid JSON as-is: %s", e)
         pass
     
     # Case 2: JSON in markdown code block
@@ -659,7 +659,7 @@ def extract_json_from_text(text: str) -> str:
                 _log.debug("Successfully extracted JSON from code block")
                 return block
             except json.JSONDecodeError as e:
-                _log.debug(f"Code block {i//2+1} is not valid JSON: {e}, attempting to fix")
+                _log.debug("Code block %d is not valid JSON: %s, attempting to fix", i//2+1, e)
                 # Try to fix incomplete JSON by balancing braces
                 fixed_block = _try_fix_incomplete_json(block)
                 if fixed_block:
@@ -671,14 +671,14 @@ def extract_json_from_text(text: str) -> str:
     start_idx = text.find('{')
     end_idx = text.rfind('}')
     if start_idx >= 0 and end_idx > start_idx:
-        _log.debug(f"Found potential JSON object from char {start_idx} to {end_idx}")
+        _log.debug("Found potential JSON object from char %d to %d", start_idx, end_idx)
         json_candidate = text[start_idx:end_idx+1]
         try:
             json.loads(json_candidate)
             _log.debug("Successfully extracted JSON from text using braces")
             return json_candidate
         except json.JSONDecodeError as e:
-            _log.debug(f"Extracted content is not valid JSON: {e}")
+            _log.debug("Extracted content is not valid JSON: %s", e)
     
     # Case 4: Try applying some cleanup first
     _log.debug("Applying advanced text cleanup and retrying JSON extraction")
@@ -720,7 +720,7 @@ def extract_json_from_text(text: str) -> str:
                 _log.debug("Successfully fixed incomplete JSON")
                 return fixed_json
     except Exception as e:
-        _log.debug(f"JSON fixing failed: {e}")
+        _log.debug("JSON fixing failed: %s", e)
     
     # Log the problematic text for debugging
     preview = text[:100] + '...' if len(text) > 100 else text
@@ -38,6 +38,13 @@ except ImportError:  # pragma: no cover
 
 # no more dummy generator; rely on llm.get_generator for stub or real
 
+# Sub-article header at the start of a (stripped) content line, used to separate
+# sub-articles in the dry-run text; compiled once rather than per rendered article.
+_SUBARTICLE_HEADER_RE = re.compile(r"^(?:#+\s*)?(?:\*\*)?\s*[ΆAΑάaα]?ρθρο", re.IGNORECASE)
+# Every character a _SUBARTICLE_HEADER_RE match can start with (case-insensitive, so
+# 'ρ' also covers 'Ρ' and 'ϱ'); body lines starting with anything else skip the regex.
+_SUBARTICLE_HEADER_START_CHARS = frozenset("#*AaΆΑάαΡρϱ")
+
 # -------------------------------------------------------------------------------
 # PUBLIC ENTRY
 # -------------------------------------------------------------------------------
@@ -219,7 +226,7 @@ def run_workflow(
         if words < 80:
             stage1_results.append(ch["content"])
         else:
-            budget = summarization_budget(ch["content"], compression_ratio=0.10)
+            budget = summarization_budget(ch["content"], compression_ratio=0.10, word_count=words)
             prompt = get_prompt("stage1_article").format(**budget) + "\n" + ch["content"]
             res = generate_with_retry(_gen_fn, prompt, budget["token_limit"], max_retries=1)
             stage1_results.append(res.text)
@@ -363,10 +370,10 @@ def _append_article(lines: List[str], art, chunk_map, *, indent: int):
     # Full content indented 4 spaces deeper
     content_prefix = prefix + "    "
     content_lines = art.text.strip().splitlines() or [""]
-    header_re = re.compile(r"^(?:#+\s*)?(?:\*\*)?\s*[ΆAΑάaα]?ρθρο", re.IGNORECASE)
     for idx, cl in enumerate(content_lines):
         # insert single-dash separator before subsequent sub-article headers inside content
-        if idx > 0 and header_re.match(cl.strip()):
+        stripped = cl.strip()
+        if idx > 0 and stripped[:1] in _SUBARTICLE_HEADER_START_CHARS and _SUBARTICLE_HEADER_RE.match(stripped):
             lines.append(f"{content_prefix}{'-'*40}")
         lines.append(f"{content_prefix}{cl}")
     # list parsed sub-article sections
@@ -10,6 +10,9 @@ import argparse
 import sys
 import unicodedata
 import importlib.util
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
 
 # Greek numeral utilities -------------------------------------------------
 # Mapping of basic Greek numerals (units and tens) based on the Milesian
@@ -95,7 +98,9 @@ ASCII_TO_GREEK = str.maketrans({
     'M': 'Μ', 'N': 'Ν', 'O': 'Ο', 'P': 'Ρ', 'T': 'Τ', 'Y': 'Υ', 'X': 'Χ',
 })
 
-# helper to strip accents from Greek text
+# helper to strip accents from Greek text; cached since the fuzzy part scan strips
+# every title token and the same words (ΜΕΡΟΣ, ΚΕΦΑΛΑΙΟ, ΑΡΘΡΟ, numerals) keep recurring
+@lru_cache(maxsize=4096)
 def strip_accents(text: str) -> str:
     """Return uppercase version of *text* without diacritics (tonos, dialytika)."""
     normalized = unicodedata.normalize('NFD', text)
@@ -137,7 +142,33 @@ except Exception:
     WORD_ORDINALS = {}
     print("Warning: could not import article_parser_utils -> word ordinals not loaded", file=sys.stderr)
 
-_word_pattern = "|".join(re.escape(k) for k in sorted(WORD_ORDINALS.keys(), key=len, reverse=True)) if WORD_ORDINALS else ""
+
+def _build_trie_regex(keys) -> str:
+    """Build a regex alternation for *keys* with shared prefixes factored out.
+
+    Equivalent to joining the escaped keys longest-first ("ΔΕΚΑΤΟ ΤΡΙΤΟ|ΔΕΚΑΤΟ|…"),
+    but the ordinals share long prefixes (ΕΚΑΤΟΣΤΟ …, ΔΕΚΑΤΟ …), so a trie lets the
+    regex engine test each prefix once instead of once per key.
+    """
+    trie: dict = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-key marker
+
+    def _emit(node) -> str:
+        branches = [re.escape(ch) + _emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # a key may end here: the longer continuations are tried first, as in longest-first order
+        return f"(?:{body})?" if "" in node else body
+
+    return _emit(trie)
+
+
+_word_pattern = _build_trie_regex(WORD_ORDINALS.keys()) if WORD_ORDINALS else ""
 # Build a single body pattern that matches EITHER a Greek numeral letter (1–3 chars)
 # OR any full-word ordinal (πΡΩΤΟ, ΔΕΥΤΕΡΟ, κ.λπ.). This lets one regex handle both forms.
 if _word_pattern:
@@ -155,139 +186,143 @@ _AFTER_BOUND = r"\s|[:.;,·\-]|$"
 RE_PART = re.compile(rf"(?<![Α-Ω])ΜΕΡΟΣ\s+{_BODY_PATTERN_CAP}(?:\s*{_PRIME_CHARS})?(?={_AFTER_BOUND})", re.IGNORECASE)
 RE_CHAPTER = re.compile(rf"(?<![Α-Ω])ΚΕΦΑΛΑΙΟ\s+{_BODY_PATTERN_CAP}(?:\s*{_PRIME_CHARS})?(?={_AFTER_BOUND})", re.IGNORECASE)
 
-# ----------------------------------------------------------------------
-# helper: check if a header token (ΜΕΡΟΣ/ΚΕΦΑΛΑΙΟ) appears in an allowed
-# leading position. Accept when the token is the very first, **or** the
-# second token and the first token is "ΑΡΘΡΟ", **or** the third token and
-# the pattern is "ΑΡΘΡΟ <number>".  This covers titles such as
-# "Άρθρο ΜΕΡΟΣ Α΄ …" and "Άρθρο 11 ΚΕΦΑΛΑΙΟ ΣΤ΄ …" while still rejecting
-# matches appearing later in the sentence (e.g. «στο Μέρος Β΄ του ν. …»).
-def _is_header_leading(idx: int, tokens) -> bool:  # tokens already accent-stripped & uppercase
-    if idx == 0:
-        return True
-    if idx == 1 and tokens[0] == "ΑΡΘΡΟ":
-        return True
-    if idx == 2 and tokens[0] == "ΑΡΘΡΟ" and tokens[1].isdigit():
-        return True
-    return False
+# rows fetched per round trip when streaming article titles from the DB
+TITLE_FETCH_BATCH_SIZE = 1000
+# bytes of the DB file SQLite may memory-map when reading titles
+TITLE_DB_MMAP_SIZE = 256 * 1024 * 1024
 
 def parse_titles(db_path, consultation_id=None):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    if consultation_id:
-        cursor.execute("SELECT id, title, consultation_id FROM articles WHERE consultation_id = ? ORDER BY id", (consultation_id,))
-    else:
-        cursor.execute("SELECT id, title, consultation_id FROM articles ORDER BY consultation_id, id")
-    rows = cursor.fetchall()
-    conn.close()
-
-    results = []
-    current_part = None
-    current_chapter = None
-    last_part_idx = None
-    last_chap_idx = None
-    prev_cid = None
-
-    for article_id, title, c_id in rows:
-        # reset tracking when moving to a new consultation -----------------------
-        if c_id != prev_cid:
-            current_part = None
-            current_chapter = None
-            last_part_idx = None
-            last_chap_idx = None
-            prev_cid = c_id
-
-        # normalize apostrophes/tonos to ASCII and collapse whitespace
-        title_norm = re.sub(r"[’‘'΄΅]", "'", title)
-        title_norm = re.sub(r"\s+", " ", title_norm).strip()
-        # replace ASCII look-alike capitals with proper Greek ones for reliable matching
-        title_norm = title_norm.translate(ASCII_TO_GREEK)
-        title_noacc = strip_accents(title_norm)
-
-        # detect part (Greek numeral or word)
-        m_part = RE_PART.match(title_noacc)
-        part_letter = None
-        if m_part:
-            token = strip_accents(m_part.group(1)).upper()
-            # token may be Greek numeral letters (Α, Β, …) or word ordinal.
-            if token in GREEK_TO_INT:
-                part_letter = token
-            else:
-                idx = WORD_ORDINALS.get(token)
-                if idx:
-                    part_letter = int_to_greek(idx)
-        # fallback to fuzzy detection
-        if part_letter is None:
-            raw_tokens = [t for t in re.split(r"\W+", title_norm) if t]
-            tokens = [strip_accents(t) for t in raw_tokens]
-            # attempt quick regex on whole string (strictly at start, allows one missing char after Μ)
-            m_after = re.match(r"^\s*Μ.?ΕΡΟΣ\s+([Α-Ω]{1,3})(?=\s|[:.;,·\-]|$)", strip_accents(title_norm))
-            if m_after:
-                part_letter = m_after.group(1)
-            else:
-                # scan tokens allowing at most one edit distance from keyword
-                for idx, (raw_tok, tok) in enumerate(zip(raw_tokens, tokens)):
-                    if _is_header_leading(idx, tokens) and raw_tok == raw_tok.upper() and _levenshtein_le1(tok, "ΜΕΡΟΣ") and idx + 1 < len(tokens):
-                        nxt = tokens[idx + 1]
-                        if re.fullmatch(r"[Α-Ω]{1,3}", nxt):
-                            part_letter = nxt
-                            break
-        if part_letter:
-            if part_letter in GREEK_TO_INT:
-                idx = GREEK_TO_INT[part_letter]
-                if last_part_idx is not None and idx not in (last_part_idx, last_part_idx + 1):
-                    print(f"Warning: non-continuous part sequence: {int_to_greek(last_part_idx)}' -> {part_letter}'", file=sys.stderr)
-                last_part_idx = idx
-                current_part = part_letter + "'"
-                last_chap_idx = None
-                current_chapter = None
-            else:
-                print(f"Unknown part letter: {part_letter}", file=sys.stderr)
-
-        # detect chapter (Greek numeral or word)
-        m_ch = RE_CHAPTER.match(title_noacc)
-        chap_letter = None
-        if m_ch:
-            token = strip_accents(m_ch.group(1)).upper()
-            if token in GREEK_TO_INT:
-                chap_letter = token
-            else:
-                idx = WORD_ORDINALS.get(token)
-                if idx:
-                    chap_letter = int_to_greek(idx)
+    # read-only: titles are only ever read here, so skip write locking and journaling
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    conn.execute(f"PRAGMA mmap_size = {TITLE_DB_MMAP_SIZE}")
+    try:
+        cursor = conn.cursor()
+        if consultation_id:
+            cursor.execute("SELECT id, title, consultation_id FROM articles WHERE consultation_id = ? ORDER BY id", (consultation_id,))
         else:
-            # case: chapter appears after a part header in same title (inline)
-            if chap_letter is None:
-                title_sa = strip_accents(title_norm)
-                idx_article = title_sa.find("ΑΡΘΡΟ")
-                search_seg = title_sa if idx_article == -1 else title_sa[:idx_article]
-                m_ch_inline = re.search(rf"(?<![Α-Ω])ΚΕΦΑΛΑΙΟ\s+{_BODY_PATTERN_CAP}(?={_AFTER_BOUND}|{_PRIME_CHARS})", search_seg, re.IGNORECASE)
-                if m_ch_inline:
-                    token = strip_accents(m_ch_inline.group(1)).upper()
-                    if token in GREEK_TO_INT:
-                        chap_letter = token
-                    else:
-                        idx = WORD_ORDINALS.get(token)
-                        if idx:
-                            chap_letter = int_to_greek(idx)
-        if chap_letter:
-            if chap_letter in GREEK_TO_INT:
-                idx = GREEK_TO_INT[chap_letter]
-                if last_chap_idx is not None and idx not in (last_chap_idx, last_chap_idx + 1):
-                    print(f"Warning: non-continuous chapter sequence in part {current_part}: {int_to_greek(last_chap_idx)}' -> {chap_letter}'", file=sys.stderr)
-                last_chap_idx = idx
-                current_chapter = chap_letter + "'"
+            cursor.execute("SELECT id, title, consultation_id FROM articles ORDER BY consultation_id, id")
+        # Stream the rows in fetchmany batches instead of materialising every title up front
+        cursor.arraysize = TITLE_FETCH_BATCH_SIZE
+        rows = chain.from_iterable(iter(cursor.fetchmany, []))
+
+        results = []
+        current_part = None
+        current_chapter = None
+        last_part_idx = None
+        last_chap_idx = None
+        prev_cid = None
+
+        for article_id, title, c_id in rows:
+            # reset tracking when moving to a new consultation -----------------------
+            if c_id != prev_cid:
+                current_part = None
+                current_chapter = None
+                last_part_idx = None
+                last_chap_idx = None
+                prev_cid = c_id
+
+            # normalize apostrophes/tonos to ASCII and collapse whitespace
+            title_norm = re.sub(r"[’‘'΄΅]", "'", title)
+            title_norm = re.sub(r"\s+", " ", title_norm).strip()
+            # replace ASCII look-alike capitals with proper Greek ones for reliable matching
+            title_norm = title_norm.translate(ASCII_TO_GREEK)
+            # computed once per title and reused by every check below (NFD + filter is the costly step)
+            title_noacc = strip_accents(title_norm)
+
+            # detect part (Greek numeral or word)
+            m_part = RE_PART.match(title_noacc)
+            part_letter = None
+            if m_part:
+                token = strip_accents(m_part.group(1)).upper()
+                # token may be Greek numeral letters (Α, Β, …) or word ordinal.
+                if token in GREEK_TO_INT:
+                    part_letter = token
+                else:
+                    idx = WORD_ORDINALS.get(token)
+                    if idx:
+                        part_letter = int_to_greek(idx)
+            # fallback to fuzzy detection
+            if part_letter is None:
+                raw_tokens = [t for t in re.split(r"\W+", title_norm) if t]
+                tokens = [strip_accents(t) for t in raw_tokens]
+                # attempt quick regex on whole string (strictly at start, allows one missing char after Μ)
+                m_after = re.match(r"^\s*Μ.?ΕΡΟΣ\s+([Α-Ω]{1,3})(?=\s|[:.;,·\-]|$)", title_noacc)
+                if m_after:
+                    part_letter = m_after.group(1)
+                else:
+                    # scan tokens allowing at most one edit distance from keyword.
+                    # The keyword must be in a leading position: the very first token,
+                    # **or** the second after "ΑΡΘΡΟ", **or** the third after
+                    # "ΑΡΘΡΟ <number>". This covers titles such as "Άρθρο ΜΕΡΟΣ Α΄ …"
+                    # while still rejecting matches appearing later in the sentence
+                    # (e.g. «στο Μέρος Β΄ του ν. …»), so only those tokens are scanned.
+                    leading = 1
+                    if tokens and tokens[0] == "ΑΡΘΡΟ":
+                        leading = 3 if len(tokens) > 1 and tokens[1].isdigit() else 2
+                    for idx, (raw_tok, tok) in enumerate(zip(raw_tokens[:leading], tokens)):
+                        if raw_tok == raw_tok.upper() and _levenshtein_le1(tok, "ΜΕΡΟΣ") and idx + 1 < len(tokens):
+                            nxt = tokens[idx + 1]
+                            if re.fullmatch(r"[Α-Ω]{1,3}", nxt):
+                                part_letter = nxt
+                                break
+            if part_letter:
+                if part_letter in GREEK_TO_INT:
+                    idx = GREEK_TO_INT[part_letter]
+                    if last_part_idx is not None and idx not in (last_part_idx, last_part_idx + 1):
+                        print(f"Warning: non-continuous part sequence: {int_to_greek(last_part_idx)}' -> {part_letter}'", file=sys.stderr)
+                    last_part_idx = idx
+                    current_part = part_letter + "'"
+                    last_chap_idx = None
+                    current_chapter = None
+                else:
+                    print(f"Unknown part letter: {part_letter}", file=sys.stderr)
+
+            # detect chapter (Greek numeral or word)
+            m_ch = RE_CHAPTER.match(title_noacc)
+            chap_letter = None
+            if m_ch:
+                token = strip_accents(m_ch.group(1)).upper()
+                if token in GREEK_TO_INT:
+                    chap_letter = token
+                else:
+                    idx = WORD_ORDINALS.get(token)
+                    if idx:
+                        chap_letter = int_to_greek(idx)
             else:
-                print(f"Unknown chapter letter: {chap_letter}", file=sys.stderr)
-
-        # assign
-        results.append({
-            'id': article_id,
-            'consultation_id': c_id,
-            'title': title,
-            'part': current_part,
-            'chapter': current_chapter
-        })
+                # case: chapter appears after a part header in same title (inline)
+                if chap_letter is None:
+                    title_sa = title_noacc
+                    idx_article = title_sa.find("ΑΡΘΡΟ")
+                    search_seg = title_sa if idx_article == -1 else title_sa[:idx_article]
+                    m_ch_inline = re.search(rf"(?<![Α-Ω])ΚΕΦΑΛΑΙΟ\s+{_BODY_PATTERN_CAP}(?={_AFTER_BOUND}|{_PRIME_CHARS})", search_seg, re.IGNORECASE)
+                    if m_ch_inline:
+                        token = strip_accents(m_ch_inline.group(1)).upper()
+                        if token in GREEK_TO_INT:
+                            chap_letter = token
+                        else:
+                            idx = WORD_ORDINALS.get(token)
+                            if idx:
+                                chap_letter = int_to_greek(idx)
+            if chap_letter:
+                if chap_letter in GREEK_TO_INT:
+                    idx = GREEK_TO_INT[chap_letter]
+                    if last_chap_idx is not None and idx not in (last_chap_idx, last_chap_idx + 1):
+                        print(f"Warning: non-continuous chapter sequence in part {current_part}: {int_to_greek(last_chap_idx)}' -> {chap_letter}'", file=sys.stderr)
+                    last_chap_idx = idx
+                    current_chapter = chap_letter + "'"
+                else:
+                    print(f"Unknown chapter letter: {chap_letter}", file=sys.stderr)
+
+            # assign
+            results.append({
+                'id': article_id,
+                'consultation_id': c_id,
+                'title': title,
+                'part': current_part,
+                'chapter': current_chapter
+            })
+    finally:
+        conn.close()
     return results
 
 
@@ -328,13 +363,14 @@ def verify_continuity(results):
     last_part_idx = 0  # treat None as 0 → previous to Α
     last_chap_idx = 0
     current_part_idx = None
+    current_part = None  # numeral of current_part_idx, so part changes are a plain string compare
 
     for row in results:
         part = row['part'][:-1] if row['part'] else None  # strip trailing '
         chapter = row['chapter'][:-1] if row['chapter'] else None
 
         # handle part change
-        if part and (current_part_idx is None or part != int_to_greek(current_part_idx)):
+        if part and part != current_part:
             part_idx = GREEK_TO_INT.get(part)
             if part_idx is None:
                 problems.append(f"Unknown part numeral {part} in article id {row['id']}")
@@ -348,6 +384,7 @@ def verify_continuity(results):
             # reset chapter sequence
             last_chap_idx = 0
             current_part_idx = part_idx
+            current_part = part
             last_part_idx = part_idx
 
         # chapter logic (only when chapter present)